@@ -1,3 +1,3 @@
 from cpu.cpu import CPU, PerfDom, PState
-from cpu.cpu_gen import CPUGenerator
+from cpu.cpu_gen import CPUGenerator, PSTATE_TABLES
 CPUGenerator = CPUGenerator()
\ No newline at end of file
@@ -15,10 +15,10 @@ class CPU:
     # One CPU == Many Cores == Many Logical CPUs
     # One Core == One Logical CPU
 
-    def __init__(self, perf_domain: PerfDom, pstates: list[PState], name: Any) -> None:
+    def __init__(self, perf_domain: PerfDom, pstates: tuple[PState, ...], name: Any) -> None:
         self.name: Any = name        
         # assume sorted in increasing order
-        self.pstates: list[PState] = pstates
+        self.pstates: tuple[PState, ...] = pstates
         self._perf_domain: PerfDom = perf_domain
 
         # maximum number of instructions executed by sec
@@ -43,9 +43,13 @@ class CPU:
     def type(self) -> PerfDom:
         return self._perf_domain
 
+    def cycles_for(self, time_ms: int) -> int:
+        return math.ceil(self.pstate[0] * time_ms * 10**-3)
+
     def execute_for(self, task: Task, time_ms: int) -> None:
-        cycles: int = math.ceil(self.pstate[0] * time_ms * 10**-3)
+        self.execute_cycles(task, math.ceil(self.pstate[0] * time_ms * 10**-3))
 
+    def execute_cycles(self, task: Task, cycles: int) -> None:
         remaining_cycles = task.remaining_cycles
 
         try:
@@ -56,6 +60,20 @@ class CPU:
         else:
             self.profiler.executed_for(task.name, cycles)
 
+    def execute_kernel_for(self, kind: str, cycles: int, time_ms: int) -> int:
+        return self.execute_kernel_cycles(kind, cycles, math.ceil(self.pstate[0] * time_ms * 10**-3))
+
+    def execute_kernel_cycles(self, kind: str, cycles: int, available: int) -> int:
+        # kernel work of cycles during available cycles, the rest of which is slack,
+        # returns the cycles left when it does not fit
+        if cycles > available:
+            self.profiler.executed_for(kind, available)
+            return cycles - available
+        self.profiler.executed_for(kind, cycles)
+        if cycles < available:
+            self.profiler.executed_for("slack", available - cycles)
+        return 0
+
     @property
     def max_capacity(self) -> int:
         return self._max_capacity
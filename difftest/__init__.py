@@ -0,0 +1 @@
+from difftest.harness import SCHEDULERS, ENGINES, Engine, Case, register_engine, run_reference, profiler_metrics, compare, check, mean_metrics, check_means, shrink, run_harness, ARRIVAL_PROCESSES, check_common_arrivals
@@ -0,0 +1,229 @@
+from __future__ import annotations
+from typing import Callable, TYPE_CHECKING
+if TYPE_CHECKING:
+    from profiler import Profiler
+
+from scheduler import EAS, LoadGenerator, ArrivalProcess, PoissonArrivals, BurstyArrivals, DiurnalArrivals, EASOverutilDisabled, EASOverutilManycores, EASOverutilTwolimits, \
+    EASOverutilTwolimitsManycores, EASCorechoiceNextfit, EASCorechoiceNextfitOverutilTwolimits, EASCorechoiceNextfitOverutilDisabled, \
+    ShardedEAS, VectorizedEAS
+from energy_model import EnergyModel
+from cpu import CPU, CPUGenerator
+
+SCHEDULERS: list[type[EAS]] = [
+    EAS,
+    EASOverutilDisabled,
+    EASOverutilManycores,
+    EASOverutilTwolimits,
+    EASOverutilTwolimitsManycores,
+    EASCorechoiceNextfit,
+    EASCorechoiceNextfitOverutilTwolimits,
+    EASCorechoiceNextfitOverutilDisabled
+]
+
+# one instance of each arrival process, for check_common_arrivals()
+ARRIVAL_PROCESSES: list[ArrivalProcess] = [
+    PoissonArrivals(0.01),
+    BurstyArrivals(0.0005, 0.01, 5000, 500),
+    DiurnalArrivals(0.005, 0.5, 20000),
+]
+
+# relative tolerance of the means of the statistically equivalent engines
+TOLERANCE_COARSE: float = 0.05
+
+# simulates the scheduler class on the topology with the load generator for some ms
+EngineRun = Callable[[type[EAS], LoadGenerator, list[CPU], EnergyModel, int], "Profiler"]
+
+
+class Engine:
+    # tolerances are relative and per metric, missing metrics must match exactly,
+    # the runs of a statistical engine are not compared one by one but through the
+    # means of each metric over the seeds of a topology
+    def __init__(self, name: str, run: EngineRun, tolerances: dict[str, float] | None = None, statistical: bool = False) -> None:
+        self.name: str = name
+        self.run: EngineRun = run
+        self.tolerances: dict[str, float] = tolerances if tolerances is not None else {}
+        self.statistical: bool = statistical
+
+
+def run_reference(scheduler: type[EAS], load_gen: LoadGenerator, cpus: list[CPU], em: EnergyModel, time: int) -> Profiler:
+    sched = scheduler(load_gen, cpus, em)
+    sched.run(time)
+    return sched.profiler
+
+
+def _run_coarse(scheduler: type[EAS], load_gen: LoadGenerator, cpus: list[CPU], em: EnergyModel, time: int) -> Profiler:
+    sched = scheduler(load_gen, cpus, em)
+    sched.run(time, coarse_tick_ms=10)
+    return sched.profiler
+
+
+def _run_sharded(scheduler: type[EAS], load_gen: LoadGenerator, cpus: list[CPU], em: EnergyModel, time: int) -> Profiler:
+    sched = ShardedEAS(scheduler, load_gen, cpus, em, nbr_shards=2, partition="interleaved")
+    sched.run(time)
+    return sched.profiler
+
+
+def _run_sharded_window(scheduler: type[EAS], load_gen: LoadGenerator, cpus: list[CPU], em: EnergyModel, time: int) -> Profiler:
+    sched = ShardedEAS(scheduler, load_gen, cpus, em, window_ticks=10)
+    sched.run(time)
+    return sched.profiler
+
+
+def _run_vectorized(scheduler: type[EAS], load_gen: LoadGenerator, cpus: list[CPU], em: EnergyModel, time: int) -> Profiler:
+    sched = VectorizedEAS(scheduler, load_gen, cpus, em)
+    sched.run(time)
+    return sched.profiler
+
+
+ENGINES: dict[str, Engine] = {}
+
+
+def register_engine(engine: Engine) -> None:
+    ENGINES[engine.name] = engine
+
+
+register_engine(Engine("reference", run_reference))
+register_engine(Engine("sharded", _run_sharded))
+register_engine(Engine("vectorized", _run_vectorized))
+# statistically equivalent only, the tolerances bound the difference of the means over the seeds
+register_engine(Engine("coarse10", _run_coarse, {
+    "total_energy": TOLERANCE_COARSE,
+    "cycles_hist.task": TOLERANCE_COARSE,
+    "cycles_hist.energy": TOLERANCE_COARSE,
+    "cycles_hist.balance": TOLERANCE_COARSE,
+    "cycles_hist.idle": TOLERANCE_COARSE,
+    "cycles_hist.slack": TOLERANCE_COARSE,
+    "ended_task": TOLERANCE_COARSE,
+    "task_placed_energy_aware": TOLERANCE_COARSE,
+    "task_placed_by_load_balancing": TOLERANCE_COARSE,
+}, statistical=True))
+register_engine(Engine("sharded-window10", _run_sharded_window, ENGINES["coarse10"].tolerances, statistical=True))
+
+
+class Case:
+    def __init__(self, scheduler: type[EAS], topology: dict[str, int], seed: int, time: int,
+                 load: tuple[int, int, float] = (10**8, 4 * 10**9, 0.99)) -> None:
+        self.scheduler: type[EAS] = scheduler
+        self.topology: dict[str, int] = topology
+        self.seed: int = seed
+        self.time: int = time
+        self.load: tuple[int, int, float] = load
+
+    def __repr__(self) -> str:
+        return f"Case({self.scheduler.__name__}, {self.topology}, seed={self.seed}, time={self.time}, load={self.load})"
+
+    def simulate(self, engine_run: EngineRun) -> dict[str, int]:
+        cpus: list[CPU] = CPUGenerator.gen(**self.topology)
+        return profiler_metrics(engine_run(self.scheduler, LoadGenerator(*self.load, self.seed), cpus, EnergyModel(cpus), self.time))
+
+
+def profiler_metrics(profiler: Profiler) -> dict[str, int]:
+    metrics: dict[str, int] = {
+        "total_energy": profiler.total_energy,
+        "created_task": profiler.created_task,
+        "ended_task": profiler.ended_task,
+        "task_placed_energy_aware": profiler.task_placed_energy_aware,
+        "task_placed_by_load_balancing": profiler.task_placed_by_load_balancing,
+    }
+    for kind, cycles in zip(("task", "energy", "balance", "idle", "slack"), profiler.cycles_hist):
+        metrics[f"cycles_hist.{kind}"] = cycles
+    return metrics
+
+
+def compare(reference: dict[str, float], other: dict[str, float], tolerances: dict[str, float]) -> list[str]:
+    divergences: list[str] = []
+    for metric, expected in reference.items():
+        tolerance: float = tolerances.get(metric, 0)
+        actual: float = other[metric]
+        if abs(actual - expected) > tolerance * abs(expected):
+            divergences.append(f"{metric}: expected {expected}, got {actual}")
+    return divergences
+
+
+def check(case: Case, engine: Engine) -> list[str]:
+    return compare(case.simulate(run_reference), case.simulate(engine.run), engine.tolerances)
+
+
+def mean_metrics(runs: list[dict[str, int]]) -> dict[str, float]:
+    return {metric: sum(run[metric] for run in runs) / len(runs) for metric in runs[0]}
+
+
+def check_means(cases: list[Case], engine: Engine) -> list[str]:
+    # compares the means of each metric over the cases
+    return compare(mean_metrics([case.simulate(run_reference) for case in cases]),
+                   mean_metrics([case.simulate(engine.run) for case in cases]), engine.tolerances)
+
+
+def _smaller_cases(case: Case) -> list[Case]:
+    cases: list[Case] = []
+    for kind, count in case.topology.items():
+        if count > 0 and sum(case.topology.values()) > 1:
+            for smaller in sorted({count // 2, count - 1}):
+                cases.append(Case(case.scheduler, {**case.topology, kind: smaller}, case.seed, case.time, case.load))
+    if case.time > 1:
+        cases.append(Case(case.scheduler, case.topology, case.seed, case.time // 2, case.load))
+    return cases
+
+
+def shrink(case: Case, engine: Engine) -> tuple[Case, list[str]]:
+    # greedily move to a smaller topology or a shorter run as long as it still diverges
+    divergences: list[str] = check(case, engine)
+    shrunk: bool = True
+    while shrunk:
+        shrunk = False
+        for smaller_case in _smaller_cases(case):
+            smaller_divergences: list[str] = check(smaller_case, engine)
+            if smaller_divergences:
+                case, divergences = smaller_case, smaller_divergences
+                shrunk = True
+                break
+    return case, divergences
+
+
+def run_harness(engine: Engine, topologies: list[dict[str, int]], seeds: list[int], time: int,
+                schedulers: list[type[EAS]] = SCHEDULERS, load: tuple[int, int, float] = (10**8, 4 * 10**9, 0.99),
+                shrink_failures: bool = True) -> list[tuple[Case, list[str]]]:
+    # returns the failing cases, shrunk to the smallest ones that still diverge
+    # the cases of a statistical engine fail together, the divergences are those of the means
+    # over the seeds and the failing case is the one of the first seed
+    failures: list[tuple[Case, list[str]]] = []
+    for scheduler in schedulers:
+        for topology in topologies:
+            if engine.statistical:
+                cases: list[Case] = [Case(scheduler, topology, seed, time, load) for seed in seeds]
+                divergences: list[str] = check_means(cases, engine)
+                if divergences:
+                    failures.append((cases[0], [f"mean over seeds {seeds}, {divergence}" for divergence in divergences]))
+                continue
+            for seed in seeds:
+                case = Case(scheduler, topology, seed, time, load)
+                divergences = check(case, engine)
+                if divergences:
+                    failures.append(shrink(case, engine) if shrink_failures else (case, divergences))
+    return failures
+
+
+def _subclasses(cls: type) -> set[type]:
+    return {sub for direct in cls.__subclasses__() for sub in {direct} | _subclasses(direct)}
+
+
+def check_common_arrivals(slots: int = 100000, seed: int = 1, repetitions: int = 4,
+                          load: tuple[int, int, float] = (10**8, 4 * 10**9, 0.99)) -> list[str]:
+    # the common random numbers of LoadGenerator.common() must give the same workload to
+    # every variant: two generators of the same seed and repetition built from the same
+    # arrival process instance must draw the same tasks at the same slots
+    divergences: list[str] = []
+    missing: set[type] = _subclasses(ArrivalProcess) - {type(arrival) for arrival in ARRIVAL_PROCESSES}
+    for cls in sorted(missing, key=lambda cls: cls.__name__):
+        divergences.append(f"{cls.__name__}: no instance in ARRIVAL_PROCESSES")
+    for arrival in [None, *ARRIVAL_PROCESSES]:
+        for antithetic in (False, True):
+            for repetition in range(repetitions):
+                batches: list[list[tuple[int, int]]] = []
+                for _ in range(2):
+                    load_gen = LoadGenerator.common(*load, seed, repetition, arrival, antithetic)
+                    batches.append([(slot, task.cycles) for slot, task in load_gen.gen_batch(slots)])
+                if batches[0] != batches[1]:
+                    divergences.append(f"{type(arrival).__name__ if arrival is not None else 'Bernoulli'}: "
+                                       f"repetition {repetition}, antithetic={antithetic}, different workloads")
+    return divergences
@@ -6,8 +6,9 @@ if TYPE_CHECKING:
 
 class EnergyModel:
     def __init__(self, cpus: list[CPU]) -> None:
-        self._power_table: dict[PerfDom, list[PState]] = {}
+        self._power_table: dict[PerfDom, tuple[PState, ...]] = {}
         self._cpus: list[CPU] = cpus
+        self._cpu_index: dict[CPU, int] = {cpu: i for i, cpu in enumerate(cpus)}
 
         for cpu in cpus:
             self._power_table[cpu.type] = cpu.pstates
@@ -18,16 +19,41 @@ class EnergyModel:
 
         for cpu in self._cpus:
             if cpu in landscape:
-                capacity: int = landscape[cpu]
-                energy: float = 0
-
-                # assume sorted in increasing order
-                for pstate in self._power_table[cpu.type]:
-                    energy = (capacity / pstate[0]) * pstate[1]
-                    if pstate[0] > capacity:
-                        break
-
-                total_energy += energy
+                total_energy += self.cpu_energy(cpu.type, landscape[cpu])
                 complexity += len(self._power_table[cpu.type])
 
         return total_energy, complexity
+
+    def compute_energy_deltas(self, candidates: list[CPU], capacities: list[int], added_capacity: int) -> tuple[list[float], int]:
+        # energy of the landscape of the candidates when added_capacity is put on
+        # each candidate in turn, the energy of each CPU is only evaluated twice
+        # (before and after), also returns the complexity of one compute_energy()
+        # call on that landscape
+        # the energies are summed in the order of the CPUs as compute_energy()
+        # does, so that the floating point results and thus the placements are identical
+        order: list[int] = sorted(range(len(candidates)), key=lambda i: self._cpu_index[candidates[i]])
+
+        complexity: int = 0
+        base_energies: list[float] = []
+        for i in order:
+            base_energies.append(self.cpu_energy(candidates[i].type, capacities[i]))
+            complexity += len(self._power_table[candidates[i].type])
+
+        energies: list[float] = [0] * len(candidates)
+        prefix_energy: float = 0
+        for position, i in enumerate(order):
+            energy: float = prefix_energy + self.cpu_energy(candidates[i].type, capacities[i] + added_capacity)
+            for base_energy in base_energies[position + 1:]:
+                energy += base_energy
+            energies[i] = energy
+            prefix_energy += base_energies[position]
+        return energies, complexity
+
+    def cpu_energy(self, domain: PerfDom, capacity: int) -> float:
+        energy: float = 0
+        # assume sorted in increasing order
+        for pstate in self._power_table[domain]:
+            energy = (capacity / pstate[0]) * pstate[1]
+            if pstate[0] > capacity:
+                break
+        return energy
@@ -1 +1,28 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any
+if TYPE_CHECKING:
+    from profiler.telemetry import Telemetry
+    from profiler.tracer import Tracer, read_trace
+
+import importlib
+
 from profiler.profiler import Profiler
+from profiler.histogram import LogHistogram
+
+
+# the telemetry and the tracer need NumPy, they are only imported on first use
+_LAZY_MODULES: dict[str, str] = {
+    "Telemetry": "profiler.telemetry",
+    "Tracer": "profiler.tracer",
+    "read_trace": "profiler.tracer",
+}
+
+__all__ = ["Profiler", "LogHistogram", *_LAZY_MODULES]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value: Any = getattr(importlib.import_module(_LAZY_MODULES[name]), name)
+    globals()[name] = value
+    return value
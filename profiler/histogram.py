@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+
+class LogHistogram:
+    # HDR-like histogram of non negative integers in a fixed number of buckets:
+    # values below 2**precision_bits have their own bucket, above that each
+    # power of two is split in 2**(precision_bits - 1) buckets, so the relative
+    # error is at most 2**(1 - precision_bits), values above 2**max_bits are clamped
+    def __init__(self, precision_bits: int = 7, max_bits: int = 32) -> None:
+        assert(0 < precision_bits <= max_bits)
+        self._precision_bits: int = precision_bits
+        self._max_bits: int = max_bits
+        self._sub_count: int = 1 << precision_bits
+        self._half_count: int = self._sub_count >> 1
+        self._counts: list[int] = [0] * (self._sub_count + (max_bits - precision_bits) * self._half_count)
+        self._total: int = 0
+
+    def _index(self, value: int) -> int:
+        if value < self._sub_count:
+            return max(value, 0)
+        shift: int = value.bit_length() - self._precision_bits
+        index: int = self._sub_count + (shift - 1) * self._half_count + (value >> shift) - self._half_count
+        return min(index, len(self._counts) - 1)
+
+    def _highest_value(self, index: int) -> int:
+        # highest value that falls in the bucket
+        if index < self._sub_count:
+            return index
+        shift: int = (index - self._sub_count) // self._half_count + 1
+        mantissa: int = (index - self._sub_count) % self._half_count + self._half_count
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        self._counts[self._index(value)] += 1
+        self._total += 1
+
+    def merge(self, other: LogHistogram) -> None:
+        assert(len(self._counts) == len(other._counts))
+        for i, count in enumerate(other._counts):
+            self._counts[i] += count
+        self._total += other._total
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def percentile(self, percent: float) -> int:
+        if self._total == 0:
+            return 0
+        threshold: float = self._total * percent / 100
+        cumulated: int = 0
+        for i, count in enumerate(self._counts):
+            cumulated += count
+            if cumulated >= threshold and count > 0:
+                return self._highest_value(i)
+        return self._highest_value(len(self._counts) - 1)
+
+    def to_sparse(self) -> list[tuple[int, int]]:
+        return [(i, count) for i, count in enumerate(self._counts) if count > 0]
+
+    @staticmethod
+    def from_sparse(sparse: list[tuple[int, int]], precision_bits: int = 7, max_bits: int = 32) -> LogHistogram:
+        hist = LogHistogram(precision_bits, max_bits)
+        for i, count in sparse:
+            hist._counts[i] += count
+            hist._total += count
+        return hist
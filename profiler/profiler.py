@@ -1,17 +1,19 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from scheduler import Clock
+    from scheduler import Clock, Task
 
 import math
 
+from profiler.histogram import LogHistogram
+
 
 class Profiler:
     def __init__(self, clock: Clock) -> None:
         self._clock = clock
 
-        self._total_energy: int = 0
-        self._cpu_power_timestamp: dict[str, tuple[int, int]] = {}
+        # (power, timestamp, energy consumed until timestamp) by CPU name
+        self._cpu_power_timestamp: dict[str, tuple[int, int, int]] = {}
 
         # one index for each task type: common, energy, balance, idle, slack
         self._cycles_hist: list[int] = [0, 0, 0, 0, 0]
@@ -21,6 +23,10 @@ class Profiler:
         self._task_placed_energy_aware: int = 0
         self._task_placed_load_balancing: int = 0
 
+        # in ms, from arrival to first execution and from arrival to termination
+        self._waiting_time_hist: LogHistogram = LogHistogram()
+        self._response_time_hist: LogHistogram = LogHistogram()
+
     def executed_for(self, task_name: str, cycles: int) -> None:
         i = 0
         match task_name:
@@ -34,20 +40,39 @@ class Profiler:
                 i = 4
         self._cycles_hist[i] += cycles
 
-    def new_task(self) -> None:
+    def new_task(self, task: Task) -> None:
         self._created_task += 1
+        task.arrive(self._clock.time)
+
+    def start_task(self, task: Task, time_ms: int) -> None:
+        task.start(time_ms)
+        if task.arrival_time >= 0:
+            self._waiting_time_hist.record(time_ms - task.arrival_time)
 
-    def end_task(self) -> None:
+    def end_task(self, task: Task, time_ms: int) -> None:
         self._ended_task += 1
+        self._response_time_hist.record(time_ms - task.arrival_time)
 
     def update_power_consumption(self, power: int, cpu_name: str) -> None:
+        energy: int = 0
         if cpu_name in self._cpu_power_timestamp:
-            previous_power = self._cpu_power_timestamp[cpu_name][0]
-            previous_timestamp = self._cpu_power_timestamp[cpu_name][1]
-            self._total_energy += previous_power * \
-                (self._clock.time - previous_timestamp)
+            previous_power, previous_timestamp, energy = self._cpu_power_timestamp[cpu_name]
+            energy += previous_power * (self._clock.time - previous_timestamp)
+
+        self._cpu_power_timestamp[cpu_name] = (power, self._clock.time, energy)
+
+    def power_consumption(self, cpu_name: str) -> tuple[int, int, int]:
+        # (power, timestamp, energy consumed until timestamp)
+        return self._cpu_power_timestamp[cpu_name]
 
-        self._cpu_power_timestamp[cpu_name] = (power, self._clock.time)
+    def set_power_consumption(self, cpu_name: str, power: int, timestamp: int, energy: int) -> None:
+        # for the engines that account the power of the ticks themselves
+        self._cpu_power_timestamp[cpu_name] = (power, timestamp, energy)
+
+    def add_cycles(self, cycles_hist: list[int]) -> None:
+        # cycles executed in bulk, in the order of cycles_hist
+        for i, cycles in enumerate(cycles_hist):
+            self._cycles_hist[i] += cycles
 
     @property
     def created_task(self) -> int:
@@ -57,13 +82,35 @@ class Profiler:
     def ended_task(self) -> int:
         return self._ended_task
 
+    @property
+    def waiting_time_hist(self) -> LogHistogram:
+        return self._waiting_time_hist
+
+    @property
+    def response_time_hist(self) -> LogHistogram:
+        return self._response_time_hist
+
     @property
     def cycles_hist(self) -> tuple[int, int, int, int, int]:
         return tuple(self._cycles_hist)
 
     @property
     def total_energy(self) -> int:
-        return math.ceil(self._total_energy)
+        return math.ceil(sum(energy for _, _, energy in self._cpu_power_timestamp.values()))
+
+    def merge_shard(self, shard: Profiler, energy_cpu_names: set[str]) -> None:
+        # add the counters of a profiler that observed a subset of the CPUs,
+        # the energy of the given CPU names is taken from it
+        for i, cycles in enumerate(shard._cycles_hist):
+            self._cycles_hist[i] += cycles
+        self._created_task += shard._created_task
+        self._ended_task += shard._ended_task
+        self._task_placed_energy_aware += shard._task_placed_energy_aware
+        self._task_placed_load_balancing += shard._task_placed_load_balancing
+        self._waiting_time_hist.merge(shard._waiting_time_hist)
+        self._response_time_hist.merge(shard._response_time_hist)
+        for cpu_name in energy_cpu_names:
+            self._cpu_power_timestamp[cpu_name] = shard._cpu_power_timestamp[cpu_name]
     
     def task_placed_by(self, wakeup_algo: str) -> None:
         if wakeup_algo == "energy":
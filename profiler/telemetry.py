@@ -0,0 +1,77 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from cpu import CPU
+    from scheduler import RunQueue
+
+import numpy as np
+
+
+class Telemetry:
+    # per CPU time series sampled every interval_ms into preallocated arrays,
+    # once the capacity is reached either every other sample is dropped and the
+    # interval doubled (decimate), or the oldest samples are overwritten (ring)
+    def __init__(self, nbr_cpus: int, interval_ms: int = 1, capacity: int = 4096, decimate: bool = True) -> None:
+        assert(capacity >= 2)
+        self._interval: int = interval_ms
+        self._capacity: int = capacity
+        self._decimate: bool = decimate
+        self._count: int = 0
+        self._next_sample: int = 0
+
+        self._time: np.ndarray = np.zeros(capacity, np.int64)
+        self._over_utilized: np.ndarray = np.zeros(capacity, np.bool_)
+        self._runqueue_cap: np.ndarray = np.zeros((capacity, nbr_cpus), np.int64)
+        self._pstate: np.ndarray = np.zeros((capacity, nbr_cpus), np.int64)
+
+    @property
+    def interval(self) -> int:
+        return self._interval
+
+    @property
+    def next_sample(self) -> int:
+        return self._next_sample
+
+    def sample(self, time_ms: int, cpus: list[CPU], run_queues: dict[CPU, RunQueue], over_utilized: bool) -> None:
+        if self._count == self._capacity and self._decimate:
+            kept: int = (self._capacity + 1) // 2
+            for buffer in (self._time, self._over_utilized, self._runqueue_cap, self._pstate):
+                buffer[:kept] = buffer[::2]
+            self._count = kept
+            self._interval *= 2
+            # too early for the doubled interval
+            if time_ms < self._time[kept - 1] + self._interval:
+                self._next_sample = int(self._time[kept - 1]) + self._interval
+                return
+
+        row: int = self._count % self._capacity
+        self._time[row] = time_ms
+        self._over_utilized[row] = over_utilized
+        runqueue_cap: np.ndarray = self._runqueue_cap[row]
+        pstate: np.ndarray = self._pstate[row]
+        for i, cpu in enumerate(cpus):
+            runqueue_cap[i] = run_queues[cpu].cap
+            pstate[i] = cpu.pstate[0]
+
+        self._count += 1
+        self._next_sample = time_ms + self._interval
+
+    def samples(self) -> np.ndarray:
+        # chronologically ordered structured array of the samples
+        nbr_cpus: int = self._runqueue_cap.shape[1]
+        size: int = min(self._count, self._capacity)
+        order: np.ndarray = np.arange(self._count - size, self._count) % self._capacity
+        samples = np.zeros(size, np.dtype([
+            ("time", np.int64),
+            ("over_utilized", np.bool_),
+            ("runqueue_cap", np.int64, (nbr_cpus,)),
+            ("pstate", np.int64, (nbr_cpus,)),
+        ]))
+        samples["time"] = self._time[order]
+        samples["over_utilized"] = self._over_utilized[order]
+        samples["runqueue_cap"] = self._runqueue_cap[order]
+        samples["pstate"] = self._pstate[order]
+        return samples
+
+    def dump(self, file_name: str) -> None:
+        np.save(file_name, self.samples())
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import struct
+import numpy as np
+
+# kinds of records, a sampled wake-up writes its candidates (if placed by
+# energy) before its own record, all with the same decision number
+WAKE_UP: int = 0
+CANDIDATE: int = 1
+MIGRATION: int = 2
+KIND_NAMES: tuple[str, ...] = ("wake_up", "candidate", "migration")
+
+# fields of a record:
+#   decision       number of the decision, counting the ones not sampled
+#   time           ms
+#   over_utilized  flag seen by the decision
+#   cpu            wake-up: waking CPU, candidate: waking CPU, migration: busiest CPU
+#   target         wake-up: chosen CPU, candidate: candidate CPU, migration: idle CPU
+#   task           name of the placed or migrated task, -1 if none or a kernel task
+#   cycles         wake-up/migration: remaining cycles of the task, candidate: run queue capacity
+#   energy         candidate: estimated energy, migration: load of the busiest CPU, NaN otherwise
+# CPUs are indexes in the CPU list of the scheduler, -1 if none
+_RECORD = struct.Struct("<IqBBhhqqd")
+TRACE_DTYPE = np.dtype([
+    ("decision", "<u4"),
+    ("time", "<i8"),
+    ("kind", "u1"),
+    ("over_utilized", "u1"),
+    ("cpu", "<i2"),
+    ("target", "<i2"),
+    ("task", "<i8"),
+    ("cycles", "<i8"),
+    ("energy", "<f8"),
+])
+assert(TRACE_DTYPE.itemsize == _RECORD.size)
+
+
+class Tracer:
+    # fixed-width binary records of the scheduling decisions in a buffered file,
+    # only one decision in sample_every is recorded and the records that would
+    # grow the file past max_bytes are dropped
+    def __init__(self, file_name: str, sample_every: int = 1, max_bytes: int | None = None, buffer_size: int = 1 << 20) -> None:
+        assert(sample_every >= 1)
+        self._file = open(file_name, "wb", buffering=buffer_size)
+        self._sample_every: int = sample_every
+        self._max_records: int | None = max_bytes // _RECORD.size if max_bytes is not None else None
+        self._decision: int = -1
+        self._active: bool = False
+        self._written: int = 0
+        self._dropped: int = 0
+
+    @property
+    def active(self) -> bool:
+        # whether the current decision is sampled
+        return self._active
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    def begin_decision(self) -> bool:
+        self._decision += 1
+        self._active = self._decision % self._sample_every == 0
+        return self._active
+
+    def wake_up(self, time_ms: int, over_utilized: bool, by_cpu: int, best_cpu: int, task: int, cycles: int) -> None:
+        self._record(WAKE_UP, time_ms, over_utilized, by_cpu, best_cpu, task, cycles, float("nan"))
+
+    def candidate(self, time_ms: int, over_utilized: bool, by_cpu: int, cpu: int, task: int, capacity: int, energy: float) -> None:
+        self._record(CANDIDATE, time_ms, over_utilized, by_cpu, cpu, task, capacity, energy)
+
+    def migration(self, time_ms: int, over_utilized: bool, from_cpu: int, to_cpu: int, task: int, cycles: int, load: float) -> None:
+        self._record(MIGRATION, time_ms, over_utilized, from_cpu, to_cpu, task, cycles, load)
+
+    def _record(self, kind: int, time_ms: int, over_utilized: bool, cpu: int, target: int,
+                task: int, cycles: int, energy: float) -> None:
+        if self._max_records is not None and self._written >= self._max_records:
+            self._dropped += 1
+            return
+        self._file.write(_RECORD.pack(self._decision, time_ms, kind, over_utilized, cpu, target, task, cycles, energy))
+        self._written += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_trace(file_name: str) -> np.ndarray:
+    # structured array of the records, a record partially written by a crash is ignored
+    with open(file_name, "rb") as f:
+        data: bytes = f.read()
+    return np.frombuffer(data, TRACE_DTYPE, len(data) // TRACE_DTYPE.itemsize).copy()
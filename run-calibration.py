@@ -0,0 +1,63 @@
+import argparse
+import multiprocessing
+import os
+import time
+
+from sweep import ColumnStore, SuccessiveHalving, threshold_candidates, topology_name, write_rungs, write_differences, write_placement, \
+    PICK_DISTRIB_INTS, MAX_DISTRIB_INSTS, CREATE_TASK_PROB, calibration_count_limits
+
+
+# number of repetitions of run-scheduling-exp.py
+REPETITION = 100
+RANDOM_SEED = 1
+
+
+def _limits(values: str) -> list[float]:
+    return [float(value) for value in values.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate the over-utilization count and load limits by successive halving.")
+    parser.add_argument("topology", help="little,middle,big counts")
+    parser.add_argument("--count-limits", help="comma separated counts of over-utilized CPUs, 2 to nbr_cpus/2+1 by default")
+    parser.add_argument("--lower-limits", default="50,60,70,80", help="comma separated load %% the over-utilization lasts until")
+    parser.add_argument("--upper-limits", default="70,80,90", help="comma separated load %% a CPU is over-utilized from, or above without hysteresis")
+    parser.add_argument("--repetitions", type=int, default=REPETITION, help="seeds of the last rung")
+    parser.add_argument("--min-repetitions", type=int, default=4, help="seeds of the first rung")
+    parser.add_argument("--eta", type=int, default=3, help="1/eta of the candidates are kept at each rung")
+    parser.add_argument("--max-task-cycles-loss", type=float, default=1.0, help="%% of task cycles w.r.t. EAS a candidate may lose")
+    parser.add_argument("--time", type=int, default=60000, help="simulated ms per run")
+    parser.add_argument("--jobs", type=int, default=multiprocessing.cpu_count(), help="number of worker processes")
+    parser.add_argument("--output-dir", default=".", help="where the .csv files are written")
+    parser.add_argument("--store", help="column store directory the runs are also appended to")
+    args = parser.parse_args()
+
+    start_time = time.time()
+
+    little, middle, big = (int(count) for count in args.topology.split(","))
+    topology: dict[str, int] = {"little": little, "middle": middle, "big": big}
+    cpus_description: str = topology_name(topology)
+    nbr_cpus: int = little + middle + big
+    count_limits: list[int] = [int(count) for count in args.count_limits.split(",")] if args.count_limits is not None \
+        else list(calibration_count_limits(nbr_cpus))
+
+    candidates = threshold_candidates(count_limits, _limits(args.lower_limits), _limits(args.upper_limits))
+    search = SuccessiveHalving(topology, candidates, (PICK_DISTRIB_INTS, MAX_DISTRIB_INSTS, CREATE_TASK_PROB),
+                               list(range(RANDOM_SEED, RANDOM_SEED + args.repetitions)), args.time,
+                               args.min_repetitions, args.eta, max_task_cycles_loss=args.max_task_cycles_loss)
+    store: ColumnStore | None = ColumnStore(args.store) if args.store is not None else None
+    finalists = search.run(args.jobs, store)
+    if store is not None:
+        store.close()
+
+    write_rungs(search.rungs, os.path.join(args.output_dir, f"halving_calibration_{cpus_description}.csv"))
+    write_differences({candidate["name"]: search.differences(candidate, args.repetitions) for candidate in finalists},
+                      os.path.join(args.output_dir, f"diff_calibration_{cpus_description}.csv"))
+    write_placement({candidate["name"]: search.placements(candidate, args.repetitions) for candidate in finalists},
+                    os.path.join(args.output_dir, f"placement_calibration_{cpus_description}.csv"))
+
+    exhaustive_runs: int = (len(candidates) + 1) * args.repetitions
+    print(f"Best: {finalists[0]['name']}, {search.nbr_runs} runs instead of {exhaustive_runs} for all the candidates on all the seeds")
+
+    end_time = time.time()
+    print("Min. elasped:", (end_time - start_time) / 60)
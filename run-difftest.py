@@ -0,0 +1,37 @@
+import argparse
+import sys
+import time
+
+from difftest import ENGINES, run_harness, check_common_arrivals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that an engine reproduces the results of the reference tick loop.")
+    parser.add_argument("engine", choices=sorted(ENGINES.keys()))
+    parser.add_argument("--topologies", nargs="+", default=["2,2,0", "4,4,0", "2,2,2"], help="little,middle,big counts")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[1, 2, 3])
+    parser.add_argument("--time", type=int, default=5000, help="simulated ms per run")
+    parser.add_argument("--no-shrink", action="store_true", help="report failing cases as is")
+    args = parser.parse_args()
+
+    start_time = time.time()
+
+    topologies: list[dict[str, int]] = []
+    for topology in args.topologies:
+        little, middle, big = (int(count) for count in topology.split(","))
+        topologies.append({"little": little, "middle": middle, "big": big})
+
+    # all the engines draw their workload from LoadGenerator
+    stream_divergences: list[str] = check_common_arrivals()
+    for divergence in stream_divergences:
+        print(f"Common random numbers: {divergence}")
+
+    failures = run_harness(ENGINES[args.engine], topologies, args.seeds, args.time, shrink_failures=not args.no_shrink)
+    for case, divergences in failures:
+        print(f"Diverging: {case}")
+        for divergence in divergences:
+            print(f"    {divergence}")
+
+    end_time = time.time()
+    print(f"{len(failures)} diverging case(s), sec. elasped: {end_time - start_time}")
+    sys.exit(1 if failures or stream_divergences else 0)
@@ -0,0 +1,131 @@
+import argparse
+from typing import Any, Callable
+import math
+import multiprocessing
+import time
+
+import numpy as np
+
+from scheduler import EAS, FluidEAS, LoadGenerator
+from energy_model import EnergyModel
+from cpu import CPU, CPUGenerator
+from sweep import Grid, topology_name, profiler_metrics, arrival_process, PICK_DISTRIB_INTS, MAX_DISTRIB_INSTS, CREATE_TASK_PROB
+
+
+# topologies of run-scheduling-exp.py
+TOPOLOGIES: list[dict[str, int]] = [
+    dict(little=2, middle=2),
+    dict(little=4, middle=4),
+    dict(little=8, middle=8),
+    dict(little=16, middle=16),
+    dict(little=32, middle=32),
+    dict(little=16, middle=16, big=16),
+    dict(little=32, middle=32, big=32),
+]
+
+# compared metrics: name -> (function of the metrics of a run, whether the error is relative
+# in % or absolute, as for the proportions)
+METRICS: dict[str, tuple[Callable[[dict[str, Any]], float], bool]] = {
+    "Energy": (lambda m: m["total_energy"], True),
+    "Task cycles": (lambda m: m["cycles_hist"][0], True),
+    "Idle cycles": (lambda m: m["cycles_hist"][3], True),
+    "Slack cycles": (lambda m: m["cycles_hist"][4], True),
+    "Ended tasks": (lambda m: m["ended_task"], True),
+    "Proportion % of task placed by energy aware": (
+        lambda m: m["task_placed_energy_aware"] / max(m["task_placed_energy_aware"] + m["task_placed_by_load_balancing"], 1e-300) * 100,
+        False),
+}
+
+
+def _run_discrete(args: tuple[dict[str, int], tuple[int, int, float], int, int]) -> dict[str, Any]:
+    topology, load, seed, duration_ms = args
+    cpus: list[CPU] = CPUGenerator.gen(**topology)
+    scheduler = EAS(LoadGenerator(*load, seed), cpus, EnergyModel(cpus))
+    scheduler.run(duration_ms)
+    return profiler_metrics(scheduler.profiler)
+
+
+def _run_fluid(configs: list[tuple[dict[str, int], tuple[int, int, float]]], duration_ms: int,
+               arrival: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+    # arrival is the arrival process spec of a grid, the same for all the configurations
+    fluid = FluidEAS([(CPUGenerator.gen(**topology), LoadGenerator(*load, arrival=arrival_process(arrival)))
+                      for topology, load in configs])
+    fluid.run(duration_ms)
+    metrics: dict[str, np.ndarray] = fluid.metrics()
+    return [{name: values[i] for name, values in metrics.items()} for i in range(len(configs))]
+
+
+def validate(loads: list[tuple[int, int, float]], seeds: list[int], duration_ms: int, jobs: int, file_name: str) -> None:
+    # error of the fluid estimates w.r.t. the mean of the discrete runs,
+    # the bound of a metric is the largest absolute error over the configurations
+    configs: list[tuple[dict[str, int], tuple[int, int, float]]] = [(topology, load) for topology in TOPOLOGIES for load in loads]
+    with multiprocessing.Pool(jobs) as pool:
+        discrete: list[dict[str, Any]] = pool.map(_run_discrete, [(topology, load, seed, duration_ms)
+                                                       for topology, load in configs for seed in seeds])
+    fluid_start = time.time()
+    fluid: list[dict[str, Any]] = _run_fluid(configs, duration_ms)
+    print("Fluid s:", time.time() - fluid_start)
+
+    bounds: dict[str, float] = {name: 0 for name in METRICS}
+    with open(file_name, "w") as f:
+        f.write("Topology,Load,Metric,Discrete mean,Discrete std,Fluid,Error,Error unit\n")
+        for i, (topology, load) in enumerate(configs):
+            runs: list[dict[str, Any]] = discrete[i * len(seeds):(i + 1) * len(seeds)]
+            for name, (metric, relative) in METRICS.items():
+                values = np.array([metric(run) for run in runs], np.float64)
+                estimate: float = float(metric(fluid[i]))
+                error: float = estimate - values.mean()
+                if relative:
+                    error = (estimate / values.mean() - 1) * 100 if values.mean() != 0 else math.inf
+                bounds[name] = max(bounds[name], abs(error))
+                f.write("{},{}_{}_{},{},{},{},{},{},{}\n".format(
+                    topology_name(topology), *load, name, np.round(values.mean(), 1), np.round(values.std(), 1),
+                    np.round(estimate, 1), np.round(error, 1), "%" if relative else "points"))
+        for name, bound in bounds.items():
+            unit: str = "%" if METRICS[name][1] else " points"
+            f.write(f"all,all,{name},,,,{np.round(bound, 1)},{unit.strip()}\n")
+            print(f"{name}: error bound {np.round(bound, 1)}{unit}")
+
+
+def screen(grid: Grid, file_name: str) -> None:
+    # fluid estimates of every topology and load of the grid, its variants and seeds are ignored
+    configs: list[tuple[dict[str, int], tuple[int, int, float]]] = [(topology, load) for topology in grid.topologies for load in grid.loads]
+    fluid: list[dict[str, Any]] = _run_fluid(configs, grid.duration_ms, grid.arrival)
+    with open(file_name, "w") as f:
+        f.write("Topology,Load,Energy,Physical energy,Task cycles,Idle cycles,Utilization %,Proportion % of task placed by energy aware\n")
+        for (topology, load), metrics in zip(configs, fluid):
+            placed: float = metrics["task_placed_energy_aware"] + metrics["task_placed_by_load_balancing"]
+            f.write("{},{}_{}_{},{},{},{},{},{},{}\n".format(
+                topology_name(topology), *load, np.round(metrics["total_energy"], 1), np.round(metrics["physical_energy"], 1),
+                np.round(metrics["cycles_hist"][0], 1), np.round(metrics["cycles_hist"][3], 1),
+                np.round(metrics["utilization"] * 100, 1),
+                np.round(metrics["task_placed_energy_aware"] / placed * 100 if placed > 0 else 0, 1)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mean-field approximation of EAS for fast energy estimates at scale.")
+    sub_parsers = parser.add_subparsers(dest="command", required=True)
+
+    validate_parser = sub_parsers.add_parser("validate", help="error bounds against the discrete simulator on the topologies of run-scheduling-exp.py")
+    validate_parser.add_argument("--create-task-probs", default=str(CREATE_TASK_PROB), help="comma separated probabilities of no task creation")
+    validate_parser.add_argument("--seeds", type=int, default=3, help="discrete runs per configuration")
+    validate_parser.add_argument("--time", type=int, default=60000, help="simulated ms")
+    validate_parser.add_argument("--jobs", type=int, default=multiprocessing.cpu_count(), help="number of worker processes")
+    validate_parser.add_argument("--output", default="fluid_error.csv")
+
+    screen_parser = sub_parsers.add_parser("screen", help="estimates of every topology and load of a grid spec")
+    screen_parser.add_argument("grid", help="JSON grid spec, see sweep/grid.py")
+    screen_parser.add_argument("--output", default="fluid.csv")
+
+    args = parser.parse_args()
+    start_time = time.time()
+
+    match args.command:
+        case "validate":
+            loads = [(PICK_DISTRIB_INTS, MAX_DISTRIB_INSTS, float(prob)) for prob in args.create_task_probs.split(",")]
+            validate(loads, list(range(1, args.seeds + 1)), args.time, args.jobs, args.output)
+        case "screen":
+            screen(Grid.load(args.grid), args.output)
+
+    end_time = time.time()
+    print("Min. elasped:", (end_time - start_time) / 60)
@@ -0,0 +1,58 @@
+import argparse
+import json
+import multiprocessing
+import time
+
+from sweep import WorkQueue, ColumnStore, work, job_run, write_grid_reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distribute a sweep over several hosts through a shared directory.")
+    sub_parsers = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = sub_parsers.add_parser("init", help="enqueue the jobs of a grid spec that are not done yet")
+    init_parser.add_argument("queue", help="shared queue directory")
+    init_parser.add_argument("grid", help="JSON grid spec, see sweep/grid.py")
+
+    work_parser = sub_parsers.add_parser("work", help="simulate jobs until the queue is empty")
+    work_parser.add_argument("queue", help="shared queue directory")
+    work_parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="number of worker processes on this host")
+    work_parser.add_argument("--heartbeat", type=float, default=10, help="seconds between two heartbeats")
+    work_parser.add_argument("--timeout", type=float, default=60, help="seconds without heartbeat before a worker is deemed dead")
+
+    merge_parser = sub_parsers.add_parser("merge", help="write the .csv files from the completed jobs")
+    merge_parser.add_argument("queue", help="shared queue directory")
+    merge_parser.add_argument("--output-dir", default=".", help="where the .csv files are written")
+    merge_parser.add_argument("--store", help="column store directory rewritten with the completed jobs")
+
+    args = parser.parse_args()
+    start_time = time.time()
+
+    match args.command:
+        case "init":
+            with open(args.grid) as f:
+                print("Enqueued jobs:", WorkQueue(args.queue).init(json.load(f)))
+        case "work":
+            processes = []
+            for _ in range(args.workers):
+                proc = multiprocessing.Process(
+                    target=work, args=[args.queue], kwargs={"heartbeat_s": args.heartbeat, "timeout_s": args.timeout})
+                proc.start()
+                processes.append(proc)
+
+            for proc in processes:
+                proc.join()
+        case "merge":
+            queue = WorkQueue(args.queue)
+            print("Pending jobs:", queue.count("pending"), "claimed jobs:", queue.count("claimed"))
+            results = queue.results()
+            write_grid_reports(queue.grid, results, args.output_dir)
+            if args.store is not None:
+                store = ColumnStore(args.store, truncate=True)
+                for job in queue.grid.jobs():
+                    if job.key in results:
+                        store.append(job_run(job), results[job.key])
+                store.close()
+
+    end_time = time.time()
+    print("Min. elasped:", (end_time - start_time) / 60)
@@ -1,63 +1,93 @@
-import math
-import numpy as np
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any
+if TYPE_CHECKING:
+    from sweep import ColumnStore
+    from profiler import Telemetry, Tracer
+    from scheduler import VectorizedEAS
+
+import os
 import multiprocessing
 import time
 
 from scheduler import EAS, LoadGenerator, EASOverutilDisabled, EASOverutilTwolimits, EASOverutilManycores, EASCorechoiceNextfit, EASCorechoiceNextfitOverutilDisabled
 from energy_model import EnergyModel
 from cpu import CPU, CPUGenerator
+from profiler import Profiler, LogHistogram
+from sweep import Progress, ProgressSlot, profiler_metrics, PICK_DISTRIB_INTS, MAX_DISTRIB_INSTS, CREATE_TASK_PROB, \
+    calibration_count_limits
 
 
 REPETITION = 100
 RANDOM_SEED = 1
-PICK_DISTRIB_INTS: int = math.floor(0.1 * 10**9)
-MAX_DISTRIB_INSTS: int = math.floor(4 * 10**9)
-CREATE_TASK_PROB: float = 0.999
-
-
-def _write_differences(diff_hist: dict[str, tuple[list[float], list[float], list[float], list[float], list[float]]], file_name: str):
-    # output means of the difference history
-    with open(file_name, "w") as f:
-        f.write("Version,Energy diff % mean,Task cycles diff % mean,Energy cycles diff % mean,Balance cycles diff % mean,Idle cycles diff % mean\n")
-        for version_name in diff_hist.keys():
-            hist = diff_hist[version_name]
-            f.write("{},{},{},{},{},{}\n".format(
-                version_name,
-                np.round(np.mean(hist[0]), 1),
-                np.round(np.mean(hist[1]), 1),
-                np.round(np.mean(hist[2]), 1),
-                np.round(np.mean(hist[3]), 1),
-                np.round(np.mean(hist[4]), 1),
-            ))
-
-
-def _write_placement(placement_hist: dict[str, tuple[list[int], list[int]]], file_name: str):
-    # output means of the task placement history
-    with open(file_name, "w") as f:
-        f.write("Version,Proportion % of task placed by energy aware mean\n")
-        for version_name in placement_hist.keys():
-            hist = placement_hist[version_name]
-            energy_hist = np.array(hist[0])
-            balance_hist = np.array(hist[1])
-            total = energy_hist + balance_hist
-            energy_propotion = energy_hist / total * 100
-            f.write("{},{}\n".format(
-                version_name,
-                np.round(energy_propotion.mean(), 1),
-            ))
-
-
-def run_experiment_on(cpus: list[CPU], cpus_description: str):
+# workload of each repetition drawn from its own streams, identical for all the versions
+# whatever their draws (LoadGenerator.common()), instead of one generator per version
+# running through all the repetitions, and with antithetic repetition pairs
+COMMON_RANDOM_NUMBERS: bool = False
+ANTITHETIC: bool = False
+# per CPU telemetry of the first repetition of each version, None to disable
+TELEMETRY_INTERVAL_MS: int | None = None
+TELEMETRY_CAPACITY: int = 4096
+# binary trace of one decision in TRACE_SAMPLE_EVERY of the first repetition of each version, None to disable
+TRACE_SAMPLE_EVERY: int | None = None
+TRACE_MAX_BYTES: int = 64 * 2**20
+# column store of the metrics of every run, one directory per experiment, None to disable
+RESULTS_STORE: str | None = "results_store"
+# seconds between two progress lines, and CSV log of the simulation throughput, None to disable
+PROGRESS_INTERVAL_S: float = 10
+PROGRESS_LOG: str | None = "throughput.csv"
+# topologies with at least this many CPUs are run by the vectorized engine (same results), None to disable
+VECTORIZED_MIN_CPUS: int | None = 32
+
+VERSIONS: list[type] = [
+    EAS,
+    EASOverutilDisabled,
+    EASOverutilTwolimits,
+    EASOverutilManycores,
+    EASCorechoiceNextfit,
+    EASCorechoiceNextfitOverutilDisabled
+]
+
+
+def _open_store(cpus_description: str) -> ColumnStore | None:
+    if RESULTS_STORE is None:
+        return None
+    # the store, the vectorized engine, the telemetry, the tracer and the reports need NumPy,
+    # they are imported where used
+    from sweep import ColumnStore
+    return ColumnStore(os.path.join(RESULTS_STORE, cpus_description), truncate=True)
+
+
+def _new_scheduler(version: type, load_gen: LoadGenerator, cpus: list[CPU], em: EnergyModel,
+                   telemetry: bool = False, **kwargs: Any) -> EAS | VectorizedEAS:
+    # the vectorized engine does not sample the telemetry
+    if VECTORIZED_MIN_CPUS is not None and len(cpus) >= VECTORIZED_MIN_CPUS and not telemetry:
+        from scheduler import VectorizedEAS
+        return VectorizedEAS(version, load_gen, cpus, em, **kwargs)
+    return version(load_gen, cpus, em, **kwargs)
+
+
+def _load_generator(load_generators: dict[Any, LoadGenerator], version: Any, repetition: int) -> LoadGenerator:
+    if COMMON_RANDOM_NUMBERS or ANTITHETIC:
+        return LoadGenerator.common(PICK_DISTRIB_INTS, MAX_DISTRIB_INSTS, CREATE_TASK_PROB, RANDOM_SEED, repetition,
+                                    antithetic=ANTITHETIC)
+    return load_generators[version]
+
+
+def _store_run(store: ColumnStore | None, topology: dict[str, int], cpus_description: str, version_name: str,
+               repetition: int, profiler: Profiler) -> None:
+    if store is not None:
+        store.append(dict(topology, topology=cpus_description, variant=version_name,
+                          pick_distrib_insts=PICK_DISTRIB_INTS, max_distrib_insts=MAX_DISTRIB_INSTS,
+                          create_task_prob=CREATE_TASK_PROB, seed=RANDOM_SEED, repetition=repetition,
+                          duration_ms=60000), profiler_metrics(profiler))
+
+
+def run_experiment_on(topology: dict[str, int], cpus_description: str, progress: ProgressSlot | None = None):
     print(f"Stating experiment on: {cpus_description}")
 
-    versions: list[type] = [
-        EAS,
-        EASOverutilDisabled,
-        EASOverutilTwolimits,
-        EASOverutilManycores,
-        EASCorechoiceNextfit,
-        EASCorechoiceNextfitOverutilDisabled
-    ]
+    cpus: list[CPU] = CPUGenerator.gen(**topology)
+
+    versions: list[type] = VERSIONS
 
     em: EnergyModel = EnergyModel(cpus)
     load_generators: dict[type, LoadGenerator] = {version: LoadGenerator(
@@ -69,15 +99,44 @@ def run_experiment_on(cpus: list[CPU], cpus_description: str):
     placement_hist: dict[str, tuple[list[int], list[int]]] = \
         {version.__name__: ([], []) for version in versions}
 
+    latency_hist: dict[str, tuple[LogHistogram, LogHistogram]] = \
+        {version.__name__: (LogHistogram(), LogHistogram()) for version in versions}
+
+    # energy and cycles of every run, for the variance of the differences
+    runs: dict[str, tuple[list[float], list[float], list[float], list[float], list[float]]] = \
+        {version.__name__: ([], [], [], [], []) for version in versions}
+
+    store: ColumnStore | None = _open_store(cpus_description)
+
     # simulate EAS and the variants,
     # and save the differences w.r.t. to EAS,
     # and also save the cycles repartition of EAS
-    for _ in range(REPETITION):
+    for repetition in range(REPETITION):
         eas_hist = (0, 0, 0, 0, 0, 0)
         for version in versions:
-            scheduler = version(load_generators[version], cpus, em)
+            telemetry: Telemetry | None = None
+            if TELEMETRY_INTERVAL_MS is not None and repetition == 0:
+                from profiler import Telemetry
+                telemetry = Telemetry(len(cpus), TELEMETRY_INTERVAL_MS, TELEMETRY_CAPACITY)
+            scheduler = _new_scheduler(version, _load_generator(load_generators, version, repetition), cpus, em, telemetry is not None)
+            if telemetry is not None:
+                scheduler.enable_telemetry(telemetry)  # type: ignore
+            tracer: Tracer | None = None
+            if TRACE_SAMPLE_EVERY is not None and repetition == 0:
+                from profiler import Tracer
+                tracer = Tracer(f"trace_{cpus_description}_{version.__name__}.bin", TRACE_SAMPLE_EVERY, TRACE_MAX_BYTES)
+                scheduler.enable_tracing(tracer)
+            if progress is not None:
+                progress.track(scheduler)
             scheduler.run(60000)
+            if progress is not None:
+                progress.run_done()
             profiler = scheduler.profiler
+            if telemetry is not None:
+                telemetry.dump(f"telemetry_{cpus_description}_{version.__name__}.npy")
+            if tracer is not None:
+                tracer.close()
+            _store_run(store, topology, cpus_description, version.__name__, repetition, profiler)
 
             power = profiler.total_energy
             task_cycles = profiler.cycles_hist[0]
@@ -87,6 +146,9 @@ def run_experiment_on(cpus: list[CPU], cpus_description: str):
             energy_placement = profiler.task_placed_energy_aware
             balance_placement = profiler.task_placed_by_load_balancing
 
+            for values, value in zip(runs[version.__name__], (power, task_cycles, energy_cycles, balance_cycles, idle_cycles)):
+                values.append(value)
+
             if version == EAS:
                 eas_hist = (power, task_cycles, energy_cycles,
                             balance_cycles, idle_cycles)
@@ -102,17 +164,32 @@ def run_experiment_on(cpus: list[CPU], cpus_description: str):
             hist[0].append(energy_placement)
             hist[1].append(balance_placement)
 
+            latency_hist[version.__name__][0].merge(profiler.waiting_time_hist)
+            latency_hist[version.__name__][1].merge(profiler.response_time_hist)
+
+        if progress is not None:
+            progress.repetition_done()
+
+    from sweep import write_differences, write_placement, write_latency, write_variance
     placement_file_name = f"placement_{cpus_description}.csv"
-    _write_placement(placement_hist, placement_file_name)
+    write_placement(placement_hist, placement_file_name)
     diff_file_name = f"diff_{cpus_description}.csv"
-    _write_differences(diff_hist, diff_file_name)
+    write_differences(diff_hist, diff_file_name)
+    latency_file_name = f"latency_{cpus_description}.csv"
+    write_latency(latency_hist, latency_file_name)
+    variance_file_name = f"variance_{cpus_description}.csv"
+    write_variance(runs, EAS.__name__, variance_file_name, ANTITHETIC)
+    if store is not None:
+        store.close()
 
     print(f"Ending experiment on: {cpus_description}")
 
 
-def run_extra_experiment_calibration_on(cpus: list[CPU], cpus_description: str):
+def run_extra_experiment_calibration_on(topology: dict[str, int], cpus_description: str, progress: ProgressSlot | None = None):
     print(f"Stating extra experiment for calibration on: {cpus_description}")
 
+    cpus: list[CPU] = CPUGenerator.gen(**topology)
+
     em: EnergyModel = EnergyModel(cpus)
     load_generators: dict[str, LoadGenerator] = {"EAS": LoadGenerator(
         PICK_DISTRIB_INTS, MAX_DISTRIB_INSTS, CREATE_TASK_PROB, RANDOM_SEED)}
@@ -122,17 +199,24 @@ def run_extra_experiment_calibration_on(cpus: list[CPU], cpus_description: str):
 
     placement_hist: dict[str, tuple[list[int], list[int]]] = {}
 
-    for count_limit in range(2, int(len(cpus) / 2) + 2):
+    for count_limit in calibration_count_limits(len(cpus)):
         version_name = f"EASOverutil{count_limit}cores"
         load_generators[version_name] = LoadGenerator(
             PICK_DISTRIB_INTS, MAX_DISTRIB_INSTS, CREATE_TASK_PROB, RANDOM_SEED)
         diff_hist[version_name] = ([], [], [], [], [])
         placement_hist[version_name] = ([], [])
 
-    for _ in range(REPETITION):
-        scheduler = EAS(load_generators["EAS"], cpus, em)
+    store: ColumnStore | None = _open_store(f"calibration_{cpus_description}")
+
+    for repetition in range(REPETITION):
+        scheduler = _new_scheduler(EAS, _load_generator(load_generators, "EAS", repetition), cpus, em)
+        if progress is not None:
+            progress.track(scheduler)
         scheduler.run(60000)
+        if progress is not None:
+            progress.run_done()
         profiler = scheduler.profiler
+        _store_run(store, topology, cpus_description, "EAS", repetition, profiler)
 
         power = profiler.total_energy
         task_cycles = profiler.cycles_hist[0]
@@ -143,13 +227,18 @@ def run_extra_experiment_calibration_on(cpus: list[CPU], cpus_description: str):
         eas_hist = (power, task_cycles, energy_cycles,
                     balance_cycles, idle_cycles)
 
-        for count_limit in range(2, int(len(cpus) / 2) + 2):
+        for count_limit in calibration_count_limits(len(cpus)):
             version_name = f"EASOverutil{count_limit}cores"
 
-            scheduler = EASOverutilManycores(
-                load_generators[version_name], cpus, em, count_limit=count_limit)
+            scheduler = _new_scheduler(
+                EASOverutilManycores, _load_generator(load_generators, version_name, repetition), cpus, em, count_limit=count_limit)
+            if progress is not None:
+                progress.track(scheduler)
             scheduler.run(60000)
+            if progress is not None:
+                progress.run_done()
             profiler = scheduler.profiler
+            _store_run(store, topology, cpus_description, version_name, repetition, profiler)
 
             power = profiler.total_energy
             task_cycles = profiler.cycles_hist[0]
@@ -170,10 +259,16 @@ def run_extra_experiment_calibration_on(cpus: list[CPU], cpus_description: str):
             hist[0].append(energy_placement)
             hist[1].append(balance_placement)
 
+        if progress is not None:
+            progress.repetition_done()
+
+    from sweep import write_differences, write_placement
     placement_file_name = f"placement_calibration_{cpus_description}.csv"
-    _write_placement(placement_hist, placement_file_name)
+    write_placement(placement_hist, placement_file_name)
     diff_calibration_file_name = f"diff_calibration_{cpus_description}.csv"
-    _write_differences(diff_hist, diff_calibration_file_name)
+    write_differences(diff_hist, diff_calibration_file_name)
+    if store is not None:
+        store.close()
 
     print(f"Ending extra experiment for calibration on: {cpus_description}")
 
@@ -181,33 +276,45 @@ def run_extra_experiment_calibration_on(cpus: list[CPU], cpus_description: str):
 if __name__ == "__main__":
     start_time = time.time()
 
-    experiment_args: list[tuple[list[CPU], str]] = [
-        (CPUGenerator.gen(little=2, middle=2), "2_little_2_middle"),
-        (CPUGenerator.gen(little=4, middle=4), "4_little_4_middle"),
-        (CPUGenerator.gen(little=8, middle=8), "8_little_8_middle"),
-        (CPUGenerator.gen(little=16, middle=16), "16_little_16_middle"),
-        (CPUGenerator.gen(little=32, middle=32), "32_little_32_middle"),
-        (CPUGenerator.gen(little=16, middle=16, big=16), "16_little_16_middle_16_big"),
-        (CPUGenerator.gen(little=32, middle=32, big=32), "32_little_32_middle_32_big")
+    # only the number of CPUs per domain is sent to the processes,
+    # which build the CPUs from the shared P-state tables
+    experiment_args: list[tuple[dict[str, int], str]] = [
+        (dict(little=2, middle=2), "2_little_2_middle"),
+        (dict(little=4, middle=4), "4_little_4_middle"),
+        (dict(little=8, middle=8), "8_little_8_middle"),
+        (dict(little=16, middle=16), "16_little_16_middle"),
+        (dict(little=32, middle=32), "32_little_32_middle"),
+        (dict(little=16, middle=16, big=16), "16_little_16_middle_16_big"),
+        (dict(little=32, middle=32, big=32), "32_little_32_middle_32_big")
     ]
 
-    extra_experiment_args: list[tuple[list[CPU], str]] = [
-        (CPUGenerator.gen(little=8, middle=8), "8_little_8_middle")
+    extra_experiment_args: list[tuple[dict[str, int], str]] = [
+        (dict(little=8, middle=8), "8_little_8_middle")
     ]
 
+    # simulated time of all the runs of each experiment, for the progress lines
+    progress = Progress(PROGRESS_INTERVAL_S)
+    slots: list[int] = []
+    for topology, cpus_description in experiment_args:
+        slots.append(progress.add(cpus_description, REPETITION * len(VERSIONS) * 60000, REPETITION))
+    for topology, cpus_description in extra_experiment_args:
+        nbr_runs: int = 1 + len(calibration_count_limits(sum(topology.values())))
+        slots.append(progress.add(f"calibration_{cpus_description}", REPETITION * nbr_runs * 60000, REPETITION))
+
     processes = []
-    for cpus, cpus_description in experiment_args:
+    for (topology, cpus_description), slot in zip(experiment_args, slots):
         proc = multiprocessing.Process(
-            target=run_experiment_on, args=[cpus, cpus_description])
+            target=run_experiment_on, args=[topology, cpus_description, progress.slot(slot)])
         proc.start()
         processes.append(proc)
 
-    for cpus, cpus_description in extra_experiment_args:
+    for (topology, cpus_description), slot in zip(extra_experiment_args, slots[len(experiment_args):]):
         proc = multiprocessing.Process(
-            target=run_extra_experiment_calibration_on, args=[cpus, cpus_description])
+            target=run_extra_experiment_calibration_on, args=[topology, cpus_description, progress.slot(slot)])
         proc.start()
         processes.append(proc)
 
+    progress.watch(processes, PROGRESS_LOG)
     for proc in processes:
         proc.join()
 
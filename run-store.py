@@ -0,0 +1,23 @@
+import argparse
+import time
+
+from sweep import load_stores, write_store_reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the .csv files from the runs of column stores.")
+    parser.add_argument("stores", nargs="+", help="column store directories, see sweep/store.py")
+    parser.add_argument("--baseline", default="EAS", help="variant the differences are computed against")
+    parser.add_argument("--prefix", default="", help="prefix of the .csv file names after diff_ and placement_")
+    parser.add_argument("--no-baseline-placement", action="store_true", help="leave the baseline out of the placement files, as for the calibration")
+    parser.add_argument("--output-dir", default=".", help="where the .csv files are written")
+    args = parser.parse_args()
+
+    start_time = time.time()
+
+    table = load_stores(args.stores)
+    print("Runs:", len(table))
+    write_store_reports(table, args.output_dir, args.baseline, args.prefix, not args.no_baseline_placement)
+
+    end_time = time.time()
+    print("Min. elasped:", (end_time - start_time) / 60)
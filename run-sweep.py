@@ -0,0 +1,48 @@
+import argparse
+import multiprocessing
+import time
+
+from sweep import Grid, Job, Ledger, ColumnStore, run_job, job_run, variant_name, write_grid_reports
+
+
+def _run(job: Job) -> tuple[Job, dict]:
+    return job, run_job(job)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a parameter grid of scheduling experiments, resumable after a crash.")
+    parser.add_argument("grid", help="JSON grid spec, see sweep/grid.py")
+    parser.add_argument("--ledger", default="sweep_ledger.jsonl", help="append-only file of the completed jobs")
+    parser.add_argument("--jobs", type=int, default=multiprocessing.cpu_count(), help="number of worker processes")
+    parser.add_argument("--output-dir", default=".", help="where the .csv files are written")
+    parser.add_argument("--store", help="column store directory the newly completed jobs are also appended to")
+    args = parser.parse_args()
+
+    start_time = time.time()
+
+    grid = Grid.load(args.grid)
+    ledger = Ledger(args.ledger)
+    jobs: list[Job] = grid.jobs()
+    pending: list[Job] = [job for job in jobs if job not in ledger]
+    print(f"{len(jobs) - len(pending)}/{len(jobs)} jobs already completed")
+
+    # a job of the ledger is skipped by a restarted sweep, so its row is written and synced to
+    # the store before the job is appended to the ledger, a sweep killed in between only
+    # stores the job twice
+    store: ColumnStore | None = None
+    if args.store is not None:
+        store = ColumnStore(args.store, flush_every=1, sync=True)
+        store.register("variant", [variant_name(variant) for variant in grid.variants])
+    with multiprocessing.Pool(args.jobs) as pool:
+        for job, metrics in pool.imap_unordered(_run, pending):
+            if store is not None:
+                store.append(job_run(job), metrics)
+            ledger.append(job, metrics)
+    ledger.close()
+    if store is not None:
+        store.close()
+
+    write_grid_reports(grid, {key: record["metrics"] for key, record in ledger.completed.items()}, args.output_dir)
+
+    end_time = time.time()
+    print("Min. elasped:", (end_time - start_time) / 60)
@@ -1,11 +1,48 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any
+if TYPE_CHECKING:
+    from scheduler.load_gen import LoadGenerator, UniformStream
+    from scheduler.eas_overutil_disabled import EASOverutilDisabled
+    from scheduler.eas_overutil_manycores import EASOverutilManycores
+    from scheduler.eas_overutil_twolimits import EASOverutilTwolimits
+    from scheduler.eas_overutil_manycore_twolimits import EASOverutilTwolimitsManycores
+    from scheduler.eas_corechoice_nextfit import EASCorechoiceNextfit
+    from scheduler.eas_corechoice_nextfit_overutil_twolimits import EASCorechoiceNextfitOverutilTwolimits
+    from scheduler.eas_corechoice_next_fit_overutil_disabled import EASCorechoiceNextfitOverutilDisabled
+    from scheduler.sharded import ShardedEAS
+    from scheduler.fluid import FluidEAS
+    from scheduler.vectorized import VectorizedEAS
+
+import importlib
+
 from scheduler.task import Task
 from scheduler.clock import Clock
-from scheduler.load_gen import LoadGenerator
+from scheduler.arrivals import ArrivalProcess, PoissonArrivals, BurstyArrivals, DiurnalArrivals
 from scheduler.eas import EAS, RunQueue
-from scheduler.eas_overutil_disabled import EASOverutilDisabled
-from scheduler.eas_overutil_manycores import EASOverutilManycores
-from scheduler.eas_overutil_twolimits import EASOverutilTwolimits
-from scheduler.eas_overutil_manycore_twolimits import EASOverutilTwolimitsManycores
-from scheduler.eas_corechoice_nextfit import EASCorechoiceNextfit
-from scheduler.eas_corechoice_nextfit_overutil_twolimits import EASCorechoiceNextfitOverutilTwolimits
-from scheduler.eas_corechoice_next_fit_overutil_disabled import EASCorechoiceNextfitOverutilDisabled
\ No newline at end of file
+
+# the load generator (which needs NumPy) and the variants are only imported on first use
+_LAZY_MODULES: dict[str, str] = {
+    "LoadGenerator": "scheduler.load_gen",
+    "UniformStream": "scheduler.load_gen",
+    "EASOverutilDisabled": "scheduler.eas_overutil_disabled",
+    "EASOverutilManycores": "scheduler.eas_overutil_manycores",
+    "EASOverutilTwolimits": "scheduler.eas_overutil_twolimits",
+    "EASOverutilTwolimitsManycores": "scheduler.eas_overutil_manycore_twolimits",
+    "EASCorechoiceNextfit": "scheduler.eas_corechoice_nextfit",
+    "EASCorechoiceNextfitOverutilTwolimits": "scheduler.eas_corechoice_nextfit_overutil_twolimits",
+    "EASCorechoiceNextfitOverutilDisabled": "scheduler.eas_corechoice_next_fit_overutil_disabled",
+    "ShardedEAS": "scheduler.sharded",
+    "FluidEAS": "scheduler.fluid",
+    "VectorizedEAS": "scheduler.vectorized",
+}
+
+__all__ = ["Task", "Clock", "ArrivalProcess", "PoissonArrivals", "BurstyArrivals", "DiurnalArrivals",
+           "EAS", "RunQueue", *_LAZY_MODULES]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_MODULES[name]), name)
+    globals()[name] = value
+    return value
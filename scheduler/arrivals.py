@@ -0,0 +1,93 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import numpy.random as npr
+
+import math
+from abc import ABC, abstractmethod
+
+
+# arrival processes over slots, a slot being one scheduler tick on one CPU
+# (slot = tick * nbr_cpus + cpu index), they directly sample the slot of the
+# next arrival so that the random generator is only used when a task arrives
+class ArrivalProcess(ABC):
+    @abstractmethod
+    def next_arrival(self, rng: npr.Generator, slot: int) -> int:
+        # first slot strictly after slot where a task arrives
+        ...
+
+    @property
+    @abstractmethod
+    def mean_rate(self) -> float:
+        # long run mean number of arrivals per slot
+        ...
+
+
+class PoissonArrivals(ArrivalProcess):
+    # one arrival per slot with probability rate, as the Bernoulli trials of
+    # LoadGenerator.gen() with rate = 1 - gen_prob, but with geometric gaps
+    def __init__(self, rate: float) -> None:
+        assert(0 < rate <= 1)
+        self._rate: float = rate
+
+    def next_arrival(self, rng: npr.Generator, slot: int) -> int:
+        return slot + int(rng.geometric(self._rate))
+
+    @property
+    def mean_rate(self) -> float:
+        return self._rate
+
+
+class BurstyArrivals(ArrivalProcess):
+    # two states Markov-modulated process, alternating between calm and burst
+    # periods of geometrically distributed lengths with their own rate
+    def __init__(self, calm_rate: float, burst_rate: float, mean_calm_slots: float, mean_burst_slots: float) -> None:
+        assert(0 < calm_rate <= 1 and 0 < burst_rate <= 1)
+        assert(mean_calm_slots >= 1 and mean_burst_slots >= 1)
+        self._rates: tuple[float, float] = (calm_rate, burst_rate)
+        self._mean_slots: tuple[float, float] = (mean_calm_slots, mean_burst_slots)
+        self._state: int = 0
+        # last slot of the current period, drawn on first use
+        self._period_end: int | None = None
+
+    def next_arrival(self, rng: npr.Generator, slot: int) -> int:
+        if self._period_end is None:
+            self._period_end = slot + int(rng.geometric(1 / self._mean_slots[self._state]))
+
+        while True:
+            arrival: int = slot + int(rng.geometric(self._rates[self._state]))
+            if arrival <= self._period_end:
+                return arrival
+            # memoryless, so sampling again from the start of the next period is exact
+            slot = self._period_end
+            self._state = 1 - self._state
+            self._period_end = slot + int(rng.geometric(1 / self._mean_slots[self._state]))
+
+    @property
+    def mean_rate(self) -> float:
+        # weighted by the mean length of the periods
+        return (self._rates[0] * self._mean_slots[0] + self._rates[1] * self._mean_slots[1]) / sum(self._mean_slots)
+
+
+class DiurnalArrivals(ArrivalProcess):
+    # rate varying as a sine of period_slots around mean_rate, sampled by thinning
+    def __init__(self, mean_rate: float, amplitude: float, period_slots: int, phase_slots: int = 0) -> None:
+        assert(0 <= amplitude <= 1 and 0 < mean_rate * (1 + amplitude) <= 1)
+        self._mean_rate: float = mean_rate
+        self._amplitude: float = amplitude
+        self._period: int = period_slots
+        self._phase: int = phase_slots
+        self._max_rate: float = mean_rate * (1 + amplitude)
+
+    @property
+    def mean_rate(self) -> float:
+        return self._mean_rate
+
+    def rate(self, slot: int) -> float:
+        return self._mean_rate * (1 + self._amplitude * math.sin(2 * math.pi * (slot + self._phase) / self._period))
+
+    def next_arrival(self, rng: npr.Generator, slot: int) -> int:
+        while True:
+            slot += int(rng.geometric(self._max_rate))
+            if rng.random() * self._max_rate < self.rate(slot):
+                return slot
@@ -1,12 +1,14 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 if TYPE_CHECKING:
     from scheduler import LoadGenerator
     from energy_model import EnergyModel
     from cpu import CPU, PerfDom
+    from profiler import Telemetry, Tracer
 
 import math
 import heapq
+from collections import deque
 
 from scheduler import Task, Clock
 from energy_model import Schedutil
@@ -40,43 +42,191 @@ class EAS:
 
         self._idle_task = Task(-1, "idle", enforce=False)
 
-    def run(self, time: int) -> None:
+        # last result of _is_over_utilized(), only kept for the telemetry
+        self._over_utilized: bool = False
+        self._telemetry: Telemetry | None = None
+        # opt-in binary trace of the decisions, the CPUs are traced by index
+        self._tracer: Tracer | None = None
+        self._cpu_index: dict[CPU, int] = {cpu: i for i, cpu in enumerate(cpus)}
+
+    @property
+    def time(self) -> int:
+        return self._clock.time
+
+    def enable_telemetry(self, telemetry: Telemetry) -> None:
+        self._telemetry = telemetry
+
+    def enable_tracing(self, tracer: Tracer) -> None:
+        self._tracer = tracer
+
+    def _sample_telemetry(self) -> None:
+        if self._telemetry is not None and self._clock.time >= self._telemetry.next_sample:
+            self._telemetry.sample(self._clock.time, self._cpus, self._run_queues, self._over_utilized)
+
+    def run(self, time: int, coarse_tick_ms: int | None = None) -> None:
+        if coarse_tick_ms is not None and coarse_tick_ms != self._sched_tick_period:
+            self._run_coarse(time, coarse_tick_ms)
+            return
+
         while self._clock.time < time:
+            self._sample_telemetry()
+
             # every 1000ms rebalance the load if CPU is over utilized
-            if self._clock.time % 1000 == 0 and self._is_over_utilized():
-                self._load_balancer()
+            if self._clock.time % 1000 == 0:
+                self._over_utilized = self._is_over_utilized()
+                if self._over_utilized:
+                    self._load_balancer()
+
+            # we assume new task could be comes at each scheduler tick
+            # on each CPU
+            # and those task are assumed to never sleep or being blocked
+            arrivals: list[tuple[int, Task]] = self._load_gen.gen_batch(len(self._cpus))
+            arrivals.reverse()
 
             # pick the next task to execute on each CPU
-            for cpu in self._cpus:
+            for i, cpu in enumerate(self._cpus):
                 queue: RunQueue = self._run_queues[cpu]
 
-                # we assume new task could be comes at each scheduler tick
-                # on each CPU
-                # and those task are assumed to never sleep or being blocked
-                new_task: Task | None = self._load_gen.gen()
-                if new_task is not None:
-                    self.profiler.new_task()
+                if arrivals and arrivals[-1][0] == i:
+                    new_task: Task = arrivals.pop()[1]
+                    self.profiler.new_task(new_task)
                     best_cpu: CPU = self._wake_up_balancer(cpu, new_task)
                     self._run_queues[best_cpu].insert(new_task)
 
-                # update P-States
-                Schedutil.update(cpu, queue.cap)
-
-                task: Task | None = queue.pop_smallest_vr()
-                if task is None:
-                    task = self._idle_task
-                
-                cpu.execute_for(task, self._sched_tick_period)
-                if task.name != "idle":
-                    if not task.terminated:
-                        queue.insert(task)
-                    elif task.name not in  ("energy", "balance"):
-                        self.profiler.end_task()
-        
+                execute_tick(cpu, queue, self._idle_task, self.profiler, self._clock.time, self._sched_tick_period)
+
             self._clock.inc_ms(self._sched_tick_period)
 
+    # advance the simulation by coarse ticks made of several scheduler ticks,
+    # arrivals are drawn as in run() and each coarse tick is only split at the
+    # scheduler ticks where a task arrives or the load balancer may run,
+    # in between each CPU executes its tasks by runs of several scheduler ticks
+    # that end where run() would pick another task or another P-state (see
+    # _execute_ticks()), the results only differ from run() when tasks of equal
+    # vruntime are ordered otherwise by the heap
+    def _run_coarse(self, time: int, coarse_tick_ms: int) -> None:
+        assert(coarse_tick_ms % self._sched_tick_period == 0)
+        period: int = self._sched_tick_period
+        nbr_cpus: int = len(self._cpus)
+
+        while self._clock.time < time:
+            self._sample_telemetry()
+            start: int = self._clock.time
+            ticks: int = min(coarse_tick_ms // period, -(-(time - start) // period))
+
+            arrivals: list[tuple[int, Task]] = self._load_gen.gen_batch(ticks * nbr_cpus)
+
+            boundaries: set[int] = {i // nbr_cpus for i, _ in arrivals}
+            balance_time: int = -(-start // 1000) * 1000
+            while balance_time < start + ticks * period:
+                if (balance_time - start) % period == 0:
+                    boundaries.add((balance_time - start) // period)
+                balance_time += 1000
+            boundaries.add(ticks)
+
+            previous: int = 0
+            arrival_i: int = 0
+            for boundary in sorted(boundaries):
+                if boundary > previous:
+                    self._execute_cpus(self._cpus, boundary - previous)
+                    self._clock.inc_ms((boundary - previous) * period)
+                    previous = boundary
+
+                if boundary == ticks:
+                    break
+
+                self._sample_telemetry()
+
+                if self._clock.time % 1000 == 0:
+                    self._over_utilized = self._is_over_utilized()
+                    if self._over_utilized:
+                        self._load_balancer()
+
+                # the scheduler tick of the boundary is split at the CPUs where a task arrives,
+                # the CPUs before them execute it without the new task as in run()
+                lo: int = 0
+                while arrival_i < len(arrivals) and arrivals[arrival_i][0] // nbr_cpus == boundary:
+                    i, new_task = arrivals[arrival_i]
+                    i %= nbr_cpus
+                    if i > lo:
+                        self._execute_cpus(self._cpus[lo:i], 1)
+                        lo = i
+                    self.profiler.new_task(new_task)
+                    best_cpu: CPU = self._wake_up_balancer(self._cpus[i], new_task)
+                    self._run_queues[best_cpu].insert(new_task)
+                    arrival_i += 1
+                self._execute_cpus(self._cpus[lo:], 1)
+                self._clock.inc_ms(period)
+                previous = boundary + 1
+
+    def _execute_cpus(self, cpus: list[CPU], ticks: int) -> None:
+        # the power of a CPU name is the one of the last CPU bearing it, as in run()
+        powers: dict[Any, list[tuple[int, int]]] = {}
+        for cpu in cpus:
+            powers[cpu.name] = self._execute_ticks(cpu, self._run_queues[cpu], ticks)
+        self._account_power(powers, ticks)
+
+    def _execute_ticks(self, cpu: CPU, queue: RunQueue, ticks: int) -> list[tuple[int, int]]:
+        # Schedutil is updated as in run() at each scheduler tick where the P-state may change:
+        # when a task or a kernel debt is popped and when the capacity of the run queue falls
+        # below the capacity of the P-state under the current one, returns the (tick, power)
+        # of each P-state taken by the CPU
+        period: int = self._sched_tick_period
+        time: int = self._clock.time
+        tick: int = 0
+        powers: list[tuple[int, int]] = []
+        while tick < ticks:
+            cap: int = queue.cap
+            Schedutil.update(cpu, cap)
+            if len(powers) == 0 or powers[-1][1] != cpu.pstate[1]:
+                powers.append((tick, cpu.pstate[1]))
+            cycles: int = cpu.cycles_for(period)
+
+            debt: tuple[str, int] | None = queue.pop_kernel_debt()
+            if debt is not None:
+                kind, kernel_cycles = debt
+                left: int = cpu.execute_kernel_cycles(kind, kernel_cycles, cycles)
+                if left > 0:
+                    queue.insert(kernel_task(kind, kernel_cycles, left))
+                tick += 1
+                continue
+
+            task: Task | None = queue.pop_smallest_vr()
+            if task is None:
+                cpu.execute_cycles(self._idle_task, (ticks - tick) * cycles)
+                break
+            if task.start_time < 0:
+                self.profiler.start_task(task, time + tick * period)
+
+            run_ticks: int = min(ticks - tick, max(1, -(-task.remaining_cycles // cycles)))
+            if queue.size != 0:
+                # the task runs until it has executed more than the next task, as when popped at each tick
+                run_ticks = min(run_ticks, max(1, -(-(queue.smallest_key - task.executed_cycles) // cycles)))
+            pstate_index: int = cpu.pstates.index(cpu.pstate)
+            if pstate_index > 0:
+                run_ticks = min(run_ticks, (cap - cpu.pstates[pstate_index - 1][0]) // cycles + 1)
+            cpu.execute_cycles(task, run_ticks * cycles)
+            tick += run_ticks
+            if not task.terminated:
+                queue.insert(task)
+            elif task.name not in ("energy", "balance"):
+                self.profiler.end_task(task, time + tick * period)
+        return powers
+
+    def _account_power(self, powers: dict[Any, list[tuple[int, int]]], ticks: int) -> None:
+        # the P-states were all set at the current time, the profiler charged each CPU name
+        # until then, the powers taken since by the CPU of the name are charged here until
+        # the last of the ticks, when run() sets the P-state for the last time
+        period: int = self._sched_tick_period
+        for name, name_powers in powers.items():
+            _, _, energy = self.profiler.power_consumption(name)
+            for (tick, power), (next_tick, _) in zip(name_powers, name_powers[1:] + [(ticks - 1, 0)]):
+                energy += power * (next_tick - tick) * period
+            self.profiler.set_power_consumption(name, name_powers[-1][1], self._clock.time + (ticks - 1) * period, energy)
+
     # extremely simplefied compared to CFS implementation
     def _load_balancer(self) -> None:
+        tracing: bool = self._tracer is not None and self._tracer.begin_decision()
         complexity: int = 0
         idle_cpu: CPU | None = None
         overloaded_cpu: tuple[CPU | None, int | float] = (None, -math.inf)
@@ -102,9 +252,16 @@ class EAS:
                 if idle_runqueue.size - 1 > 0:
                     complexity += math.ceil(math.log2(idle_runqueue.size - 1))
 
+            if tracing:
+                self._tracer.migration(self._clock.time, self._over_utilized, self._cpu_index[overloaded_cpu[0]],  # type: ignore
+                                       self._cpu_index[idle_cpu], task.uuid if task is not None else -1,
+                                       task.remaining_cycles if task is not None else 0, overloaded_cpu[1])
+        elif tracing:
+            self._tracer.migration(self._clock.time, self._over_utilized, -1, -1, -1, 0, overloaded_cpu[1])  # type: ignore
+
         # simulate the load balancer
         # cpus[0] is responsible of the scheduling group
-        self._run_queues[self._cpus[0]].insert_kernel_task(Task(100 * complexity, "balance"))
+        self._run_queues[self._cpus[0]].add_kernel_debt("balance", 100 * complexity)
 
     def _is_over_utilized(self) -> bool:
         for cpu in self._cpus:
@@ -113,7 +270,9 @@ class EAS:
         return False
 
     def _wake_up_balancer(self, by_cpu: CPU, task: Task) -> CPU:
-        if self._is_over_utilized():
+        tracing: bool = self._tracer is not None and self._tracer.begin_decision()
+        self._over_utilized = self._is_over_utilized()
+        if self._over_utilized:
             self.profiler.task_placed_by("balance")
             best_cpu: CPU = by_cpu
             for cpu in self._cpus:
@@ -121,14 +280,23 @@ class EAS:
                     best_cpu = cpu
 
             # simulate the wake up balancer
-            self._run_queues[by_cpu].insert_kernel_task(Task(10 * len(self._cpus), "balance"))
+            self._run_queues[by_cpu].add_kernel_debt("balance", 10 * len(self._cpus))
 
         else:
             self.profiler.task_placed_by("energy")
             best_cpu = self._find_energy_efficient_cpu(by_cpu, task)
 
+        if tracing:
+            self._tracer.wake_up(self._clock.time, self._over_utilized, self._cpu_index[by_cpu],  # type: ignore
+                                 self._cpu_index[best_cpu], task.uuid, task.remaining_cycles)
         return best_cpu
 
+    def _trace_candidates(self, by_cpu: CPU, task: Task, candidates: list[CPU], energies: list[float]) -> None:
+        # called by _find_energy_efficient_cpu() during a sampled decision
+        for candidate, energy in zip(candidates, energies):
+            self._tracer.candidate(self._clock.time, self._over_utilized, self._cpu_index[by_cpu],  # type: ignore
+                                   self._cpu_index[candidate], task.uuid, self._run_queues[candidate].cap, energy)
+
     def _find_energy_efficient_cpu(self, by_cpu: CPU, task: Task) -> CPU:
         complexity: int = 0
         
@@ -146,18 +314,19 @@ class EAS:
 
         best_cpu: CPU | None = None
         best_cpu_energy: float = math.inf
-        landscape: dict[CPU, int] = {cpu: self._run_queues[cpu].cap for cpu in candidates}
-        for candidate in candidates:
-            landscape[candidate] += task.remaining_cycles
-            energy, em_complexity = self._em.compute_energy(landscape)
-            landscape[candidate] -= task.remaining_cycles
+        # the simulated complexity is still the one of one compute_energy() call per candidate
+        energies, em_complexity = self._em.compute_energy_deltas(
+            candidates, [self._run_queues[cpu].cap for cpu in candidates], task.remaining_cycles)
+        for candidate, energy in zip(candidates, energies):
             if energy < best_cpu_energy:
                 best_cpu = candidate
                 best_cpu_energy = energy
             complexity += em_complexity             
+        if self._tracer is not None and self._tracer.active:
+            self._trace_candidates(by_cpu, task, candidates, energies)
 
         # simulate the energy efficient wake-up balancer
-        self._run_queues[by_cpu].insert_kernel_task(Task(100 * complexity, "energy"))
+        self._run_queues[by_cpu].add_kernel_debt("energy", 100 * complexity)
 
         # assert(best_cpu is not None) was used during dev phase
         return best_cpu # type: ignore
@@ -207,20 +376,31 @@ class _RunQueueNode():
 class RunQueue():
     def __init__(self):
         self._queue: list[_RunQueueNode] = []
-        self._kernel_queue: list[_RunQueueNode] = []
+        # cycles of the kernel work (wake-up and load balancers) owed by the CPU, in FIFO order,
+        # each item is executed alone during a tick before the tasks
+        self._kernel_debt: deque[tuple[str, int]] = deque()
         self._total_cap: int = 0
 
     @property
     def size(self) -> int:
         return len(self._queue)
 
+    def pop_kernel_debt(self) -> None | tuple[str, int]:
+        # (kind, cycles) of the next kernel work item
+        if len(self._kernel_debt) == 0:
+            return None
+        debt: tuple[str, int] = self._kernel_debt.popleft()
+        self._total_cap -= debt[1]
+        return debt
+
+    @property
+    def smallest_key(self) -> int:
+        return self._queue[0].key
+
     def pop_smallest_vr(self) -> None | Task:
-        if len(self._kernel_queue) != 0:
-            task_node: _RunQueueNode = self._kernel_queue.pop(0)
-        elif self.size == 0:
+        if self.size == 0:
             return None
-        else:
-            task_node: _RunQueueNode = heapq.heappop(self._queue)
+        task_node: _RunQueueNode = heapq.heappop(self._queue)
         
         self._total_cap -= task_node.cap
         return task_node.task
@@ -245,7 +425,43 @@ class RunQueue():
         self._total_cap += task_node.cap
         heapq.heappush(self._queue, task_node)
     
-    def insert_kernel_task(self, task: Task):
-        task_node = _RunQueueNode(task)
-        self._total_cap += task_node.cap
-        self._kernel_queue.append(task_node)
+    def add_kernel_debt(self, kind: str, cycles: int):
+        # kind is "energy" or "balance"
+        self._total_cap += cycles
+        self._kernel_debt.append((kind, cycles))
+
+
+def kernel_task(kind: str, cycles: int, left: int) -> Task:
+    # kernel work item of cycles longer than its tick, it is then scheduled as a task
+    task = Task(cycles, kind)
+    task.execute(cycles - left)
+    return task
+
+
+def execute_tick(cpu: CPU, queue: RunQueue, idle_task: Task, profiler: Profiler, time: int, period: int) -> None:
+    # one scheduler tick of the CPU at time, shared by EAS.run() and the shards of ShardedEAS
+
+    # update P-States
+    Schedutil.update(cpu, queue.cap)
+
+    # the kernel work is executed first, one item per tick
+    debt: tuple[str, int] | None = queue.pop_kernel_debt()
+    if debt is not None:
+        kind, kernel_cycles = debt
+        left: int = cpu.execute_kernel_for(kind, kernel_cycles, period)
+        if left > 0:
+            queue.insert(kernel_task(kind, kernel_cycles, left))
+        return
+
+    task: Task | None = queue.pop_smallest_vr()
+    if task is None:
+        task = idle_task
+    elif task.start_time < 0:
+        profiler.start_task(task, time)
+
+    cpu.execute_for(task, period)
+    if task.name != "idle":
+        if not task.terminated:
+            queue.insert(task)
+        elif task.name not in ("energy", "balance"):
+            profiler.end_task(task, time + period)
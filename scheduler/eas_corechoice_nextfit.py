@@ -38,18 +38,19 @@ class EASCorechoiceNextfit(EAS):
 
         best_cpu: CPU | None = None
         best_cpu_energy: float = math.inf
-        landscape: dict[CPU, int] = {cpu: self._run_queues[cpu].cap for cpu in candidates}
-        for candidate in candidates:
-            landscape[candidate] += task.remaining_cycles
-            energy, em_complexity = self._em.compute_energy(landscape)
-            landscape[candidate] -= task.remaining_cycles
+        # the simulated complexity is still the one of one compute_energy() call per candidate
+        energies, em_complexity = self._em.compute_energy_deltas(
+            candidates, [self._run_queues[cpu].cap for cpu in candidates], task.remaining_cycles)
+        for candidate, energy in zip(candidates, energies):
             if energy < best_cpu_energy:
                 best_cpu = candidate
                 best_cpu_energy = energy
             complexity += em_complexity
+        if self._tracer is not None and self._tracer.active:
+            self._trace_candidates(by_cpu, task, candidates, energies)
 
         # simulate the energy efficient wake-up balancer
-        self._run_queues[by_cpu].insert_kernel_task(Task(100 * complexity, "energy"))
+        self._run_queues[by_cpu].add_kernel_debt("energy", 100 * complexity)
 
         # assert(best_cpu is not None) was used during dev phase
         return best_cpu # type: ignore
\ No newline at end of file
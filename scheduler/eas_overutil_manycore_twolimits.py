@@ -8,9 +8,13 @@ if TYPE_CHECKING:
 from scheduler import EAS
 
 class EASOverutilTwolimitsManycores(EAS):
-    def __init__(self, load_gen: LoadGenerator, cpus: list[CPU], em: EnergyModel, sched_tick_period: int = 1, count_limit: int = -1) -> None:
+    def __init__(self, load_gen: LoadGenerator, cpus: list[CPU], em: EnergyModel, sched_tick_period: int = 1, count_limit: int = -1,
+                 lower_limit: float = 70, upper_limit: float = 80) -> None:
         super().__init__(load_gen, cpus, em, sched_tick_period)
         self._was_over_utilized = False
+        # load in % from which a CPU is over utilized (upper), and from which it stays so once it was (lower)
+        self._lower_limit: float = lower_limit
+        self._upper_limit: float = upper_limit
         
         if count_limit == -1:
             self._count_limit: float = len(self._cpus) / 2
@@ -24,12 +28,12 @@ class EASOverutilTwolimitsManycores(EAS):
 
         for cpu in self._cpus:
             load = self._compute_load(cpu)
-            if load >= 80:
+            if load >= self._upper_limit:
                 count += 1
                 if count >= self._count_limit:
                     self._was_over_utilized = True
                     return True
-            elif self._was_over_utilized and load >= 70:
+            elif self._was_over_utilized and load >= self._lower_limit:
                 above_lower_limit = True
 
         if not above_lower_limit:
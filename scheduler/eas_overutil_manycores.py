@@ -1,10 +1,18 @@
-from cpu import CPU
-from energy_model import EnergyModel
-from scheduler import EAS, LoadGenerator
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from scheduler import LoadGenerator
+    from energy_model import EnergyModel
+    from cpu import CPU
+
+from scheduler import EAS
 
 class EASOverutilManycores(EAS):
-    def __init__(self, load_gen: LoadGenerator, cpus: list[CPU], em: EnergyModel, sched_tick_period_ms: int = 1, count_limit: int = -1) -> None:        
+    def __init__(self, load_gen: LoadGenerator, cpus: list[CPU], em: EnergyModel, sched_tick_period_ms: int = 1, count_limit: int = -1,
+                 load_limit: float = 80) -> None:
         super().__init__(load_gen, cpus, em, sched_tick_period_ms)
+        # load in % above which a CPU is over utilized
+        self._load_limit: float = load_limit
 
         if count_limit == -1:
             self._count_limit: int = int(len(self._cpus) / 2)
@@ -17,7 +25,7 @@ class EASOverutilManycores(EAS):
     def _is_over_utilized(self) -> bool:
         count: int = 0
         for cpu in self._cpus:
-            if self._compute_load(cpu) > 80:
+            if self._compute_load(cpu) > self._load_limit:
                 count += 1
                 if count >= self._count_limit:
                     return True
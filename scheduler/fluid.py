@@ -0,0 +1,229 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from cpu import CPU, PerfDom
+    from scheduler import LoadGenerator
+
+import numpy as np
+
+
+# number of points of the tabulated tail of the residual task sizes
+_TAIL_POINTS: int = 1024
+
+
+def _residual_tail(low: float, mode: float, high: float) -> tuple[np.ndarray, np.ndarray]:
+    # P(remaining cycles of the task in execution > r) on a grid of r from 0 to high,
+    # for task sizes of triangular distribution (the equilibrium distribution of the
+    # renewal theory: E[(X - r)+] / E[X]), also returns the mean remaining cycles
+    r: np.ndarray = np.linspace(0, high, _TAIL_POINTS)
+    survival: np.ndarray = np.where(
+        r < low, 1.0, np.where(
+            r < mode, 1 - (r - low)**2 / ((high - low) * max(mode - low, 1e-12)),
+            (high - r)**2 / ((high - low) * max(high - mode, 1e-12))))
+    step: float = r[1] - r[0]
+    # integral of the survival from r to high
+    excess: np.ndarray = np.concatenate([np.cumsum(((survival[1:] + survival[:-1]) / 2 * step)[::-1])[::-1], [0.0]])
+    tail: np.ndarray = excess / excess[0]
+    return tail, float(((tail[1:] + tail[:-1]) / 2 * step).sum())
+
+
+class FluidEAS:
+    # mean-field approximation of EAS on a batch of configurations (CPUs, load
+    # generator), vectorized over the configurations, the state of a perf
+    # domain is the mean backlog of cycles of its CPUs:
+    # - the backlog is fed at each tick by the mean number and size of the
+    #   arriving tasks, and held by a fraction of busy CPUs that each have at
+    #   least the mean remaining cycles of the task in execution, the others are idle
+    # - Schedutil picks for a busy CPU the first P-state whose capacity exceeds its
+    #   backlog, which is drained by the cycles of that P-state, an idle CPU stays
+    #   at its first P-state
+    # - the system is over-utilized with the probability that a busy CPU has a
+    #   backlog above the threshold, the remaining cycles of its task following
+    #   the equilibrium distribution of the task sizes
+    # - when not over-utilized, the arrivals go to the domain whose energy (as
+    #   computed by EnergyModel) grows the least with a task of mean size on its
+    #   least loaded CPU, otherwise to the last domain with idle CPUs, or else to
+    #   each domain in proportion to its number of CPUs (the waking CPU keeps the task)
+    # - each kernel task takes a tick of the waking CPU, the cycles beyond its
+    #   own are slack as is half a tick of each terminated task
+    # the random generators of the load generators are left untouched
+    #
+    # the energy of the profiler is the one of the last CPU (every CPU has the
+    # same name), total_energy reproduces that, physical_energy sums all CPUs
+    def __init__(self, configs: list[tuple[list[CPU], LoadGenerator]], sched_tick_period_ms: int = 1,
+                 over_utilized_threshold: float | None = 80) -> None:
+        self._period: int = sched_tick_period_ms
+        self._threshold: float | None = over_utilized_threshold
+        self._time: int = 0
+
+        domains: list[list[PerfDom]] = []
+        for cpus, _ in configs:
+            domains.append([])
+            for cpu in cpus:
+                if cpu.type not in domains[-1]:
+                    domains[-1].append(cpu.type)
+        nbr_configs: int = len(configs)
+        nbr_domains: int = max(len(config_domains) for config_domains in domains)
+        nbr_pstates: int = max(len(cpu.pstates) for cpus, _ in configs for cpu in cpus)
+
+        # the missing domains have no CPU, the shorter P-state tables repeat their last P-state
+        self._nbr_cpus: np.ndarray = np.zeros((nbr_configs, nbr_domains))
+        self._caps: np.ndarray = np.ones((nbr_configs, nbr_domains, nbr_pstates))
+        self._power: np.ndarray = np.zeros((nbr_configs, nbr_domains, nbr_pstates))
+        self._last_domain: np.ndarray = np.zeros(nbr_configs, np.int64)
+        self._energy_complexity: np.ndarray = np.zeros(nbr_configs)
+        self._arrivals: np.ndarray = np.zeros(nbr_configs)
+        self._task_size: np.ndarray = np.zeros(nbr_configs)
+        self._residual: np.ndarray = np.zeros(nbr_configs)
+        self._tail: np.ndarray = np.zeros((nbr_configs, _TAIL_POINTS))
+        self._tail_step: np.ndarray = np.zeros(nbr_configs)
+        for c, (cpus, load_gen) in enumerate(configs):
+            for cpu in cpus:
+                d: int = domains[c].index(cpu.type)
+                self._nbr_cpus[c, d] += 1
+                pstates: np.ndarray = np.asarray(cpu.pstates, np.float64)
+                self._caps[c, d] = np.concatenate([pstates[:, 0], np.repeat(pstates[-1, 0], nbr_pstates - len(pstates))])
+                self._power[c, d] = np.concatenate([pstates[:, 1], np.repeat(pstates[-1, 1], nbr_pstates - len(pstates))])
+            self._last_domain[c] = domains[c].index(cpus[-1].type)
+            # same complexity as _find_energy_efficient_cpu() with one candidate per domain
+            em_complexity: int = sum(len(next(cpu for cpu in cpus if cpu.type == domain).pstates) for domain in domains[c])
+            self._energy_complexity[c] = len(cpus) + len(domains[c]) * em_complexity
+            # one slot per CPU and per tick
+            self._arrivals[c] = load_gen.arrival_rate * len(cpus)
+            self._task_size[c] = load_gen.mean_instructions
+            self._tail[c], self._residual[c] = _residual_tail(10, load_gen.instructions_peak_distrib, load_gen.max_instructions)
+            self._tail_step[c] = load_gen.max_instructions / (_TAIL_POINTS - 1)
+
+        self._has_cpus: np.ndarray = self._nbr_cpus > 0
+        self._total_cpus: np.ndarray = self._nbr_cpus.sum(axis=1)
+        self._max_caps: np.ndarray = self._caps[:, :, -1]
+        self._backlog: np.ndarray = np.zeros((nbr_configs, nbr_domains))
+
+        self._executed_cycles: np.ndarray = np.zeros(nbr_configs)
+        self._kernel_cycles: np.ndarray = np.zeros(nbr_configs)
+        self._energy_cycles: np.ndarray = np.zeros(nbr_configs)
+        self._balance_cycles: np.ndarray = np.zeros(nbr_configs)
+        self._idle_cycles: np.ndarray = np.zeros(nbr_configs)
+        self._slack_cycles: np.ndarray = np.zeros(nbr_configs)
+        self._placed_energy_aware: np.ndarray = np.zeros(nbr_configs)
+        self._placed_by_balance: np.ndarray = np.zeros(nbr_configs)
+        self._energy: np.ndarray = np.zeros(nbr_configs)
+        self._physical_energy: np.ndarray = np.zeros(nbr_configs)
+        self._max_cycles: np.ndarray = np.zeros(nbr_configs)
+
+    def _pstate(self, table: np.ndarray, backlog: np.ndarray) -> np.ndarray:
+        # value in table of the P-state picked by Schedutil for each backlog
+        pstates: np.ndarray = np.minimum((self._caps <= backlog[:, :, None]).sum(axis=2), self._caps.shape[2] - 1)
+        return np.take_along_axis(table, pstates[:, :, None], axis=2)[:, :, 0]
+
+    def _cpu_energy(self, backlog: np.ndarray) -> np.ndarray:
+        # EnergyModel.cpu_energy() of each backlog
+        return backlog / self._pstate(self._caps, backlog) * self._pstate(self._power, backlog)
+
+    def _residual_above(self, cycles: np.ndarray) -> np.ndarray:
+        # P(remaining cycles of the task in execution > cycles)
+        position: np.ndarray = np.clip(cycles / self._tail_step[:, None], 0, _TAIL_POINTS - 1)
+        lower: np.ndarray = np.floor(position).astype(np.int64)
+        upper: np.ndarray = np.minimum(lower + 1, _TAIL_POINTS - 1)
+        fraction: np.ndarray = position - lower
+        return (np.take_along_axis(self._tail, lower, axis=1) * (1 - fraction)
+                + np.take_along_axis(self._tail, upper, axis=1) * fraction)
+
+    def run(self, time: int) -> None:
+        configs: np.ndarray = np.arange(len(self._backlog))
+        domains: np.ndarray = np.arange(self._backlog.shape[1])
+        residual: np.ndarray = self._residual[:, None]
+        idle_cycles: np.ndarray = np.ceil(self._caps[:, :, 0] * self._period * 10**-3)
+        idle_power: np.ndarray = self._power[:, :, 0]
+        max_cycles: np.ndarray = (self._nbr_cpus * np.ceil(self._max_caps * self._period * 10**-3)).sum(axis=1)
+
+        while self._time < time:
+            busy: np.ndarray = np.minimum(self._backlog / residual, 1)
+            busy_backlog: np.ndarray = np.where(busy > 0, self._backlog / np.maximum(busy, 1e-300), 0)
+            busy_cycles: np.ndarray = np.ceil(self._pstate(self._caps, busy_backlog) * self._period * 10**-3)
+            # mean cycles of a tick of a CPU, taken by a kernel task
+            tick_cycles: np.ndarray = (self._nbr_cpus * (busy * busy_cycles + (1 - busy) * idle_cycles)).sum(axis=1) / self._total_cpus
+
+            over_utilized: np.ndarray = np.zeros(len(configs))
+            if self._threshold is not None:
+                above: np.ndarray = self._residual_above(self._threshold / 100 * self._max_caps - (busy_backlog - residual))
+                not_above: np.ndarray = np.where(self._has_cpus, (1 - above) ** (self._nbr_cpus * busy), 1)
+                over_utilized = 1 - not_above.prod(axis=1)
+
+            added: np.ndarray = np.zeros_like(self._backlog)
+            kernel_cycles: np.ndarray = np.zeros(len(configs))
+            kernel_tasks: np.ndarray = np.zeros(len(configs))
+
+            # load balancer, its kernel task runs on the first CPU
+            if self._time % 1000 == 0:
+                balance_cycles: np.ndarray = over_utilized * 100 * self._total_cpus
+                self._balance_cycles += balance_cycles
+                kernel_cycles += balance_cycles
+                added[:, 0] += over_utilized * tick_cycles / self._nbr_cpus[:, 0]
+                self._kernel_cycles += over_utilized * tick_cycles
+
+            # energy aware placement on the least loaded CPU of the domain of least energy increase
+            candidate_backlog: np.ndarray = np.where(busy < 1, 0, busy_backlog)
+            increase: np.ndarray = self._cpu_energy(candidate_backlog + self._task_size[:, None]) - self._cpu_energy(candidate_backlog)
+            best_domain: np.ndarray = np.where(self._has_cpus, increase, np.inf).argmin(axis=1)
+            volume: np.ndarray = self._arrivals * self._task_size
+            energy_aware: np.ndarray = (1 - over_utilized) * volume
+            added[configs, best_domain] += energy_aware / self._nbr_cpus[configs, best_domain]
+
+            # placement by balance on the last domain with idle CPUs, or on the waking CPUs
+            last_idle: np.ndarray = np.where(self._has_cpus & (busy < 1), domains, -1).max(axis=1)
+            balance: np.ndarray = over_utilized * volume
+            to_idle: np.ndarray = last_idle >= 0
+            added[configs[to_idle], last_idle[to_idle]] += balance[to_idle] / self._nbr_cpus[configs[to_idle], last_idle[to_idle]]
+            added[~to_idle] += (balance[~to_idle] / self._total_cpus[~to_idle])[:, None]
+
+            # kernel tasks of the wake-up balancers on the waking CPUs
+            energy_cycles: np.ndarray = (1 - over_utilized) * self._arrivals * 100 * self._energy_complexity
+            balance_cycles = over_utilized * self._arrivals * 10 * self._total_cpus
+            self._energy_cycles += energy_cycles
+            self._balance_cycles += balance_cycles
+            kernel_cycles += energy_cycles + balance_cycles
+            kernel_tasks += self._arrivals
+            added += (self._arrivals * tick_cycles / self._total_cpus)[:, None]
+            self._kernel_cycles += self._arrivals * tick_cycles
+            self._slack_cycles += np.maximum(kernel_tasks * tick_cycles - kernel_cycles, 0)
+            self._placed_energy_aware += (1 - over_utilized) * self._arrivals
+            self._placed_by_balance += over_utilized * self._arrivals
+            self._backlog += np.where(self._has_cpus, added, 0)
+
+            # P-states and execution of one tick
+            busy = np.minimum(self._backlog / residual, 1)
+            busy_backlog = np.where(busy > 0, self._backlog / np.maximum(busy, 1e-300), 0)
+            busy_cycles = np.ceil(self._pstate(self._caps, busy_backlog) * self._period * 10**-3)
+            busy_power: np.ndarray = self._pstate(self._power, busy_backlog)
+            executed: np.ndarray = busy * np.minimum(busy_backlog, busy_cycles)
+            self._backlog = np.maximum(self._backlog - executed, 0)
+            self._executed_cycles += (self._nbr_cpus * executed).sum(axis=1)
+            self._idle_cycles += (self._nbr_cpus * ((1 - busy) * idle_cycles + busy * busy_cycles - executed)).sum(axis=1)
+            self._slack_cycles += (self._nbr_cpus * executed / self._task_size[:, None] * busy_cycles / 2).sum(axis=1)
+            self._max_cycles += max_cycles
+            power: np.ndarray = busy * busy_power + (1 - busy) * idle_power
+            self._physical_energy += (self._nbr_cpus * power).sum(axis=1) * self._period
+            self._energy += power[configs, self._last_domain] * self._period
+
+            self._time += self._period
+
+    @property
+    def time(self) -> int:
+        return self._time
+
+    def metrics(self) -> dict[str, np.ndarray]:
+        # estimates of each configuration, named as the metrics of the profiler
+        task_cycles: np.ndarray = np.maximum(self._executed_cycles - self._kernel_cycles, 0)
+        return {
+            "total_energy": self._energy,
+            "physical_energy": self._physical_energy,
+            "cycles_hist": np.stack([task_cycles, self._energy_cycles, self._balance_cycles,
+                                     self._idle_cycles, self._slack_cycles], axis=1),
+            "created_task": self._arrivals * self._time / self._period,
+            "ended_task": task_cycles / self._task_size,
+            "task_placed_energy_aware": self._placed_energy_aware,
+            "task_placed_by_load_balancing": self._placed_by_balance,
+            # executed cycles over the cycles of all the CPUs at their highest P-state
+            "utilization": self._executed_cycles / np.maximum(self._max_cycles, 1),
+        }
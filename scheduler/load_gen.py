@@ -1,17 +1,94 @@
+from __future__ import annotations
+from typing import Any, TYPE_CHECKING
+if TYPE_CHECKING:
+    from scheduler.arrivals import ArrivalProcess
+
+import copy
+import math
 import numpy.random as npr
 
 from scheduler import Task
 
 
+class UniformStream:
+    # random generator drawing each value by inversion of one uniform, so that the
+    # antithetic stream of a seed, which draws 1 - u where the other draws u, gives
+    # negatively correlated values, it provides what LoadGenerator and the arrival
+    # processes draw from an npr.Generator
+    def __init__(self, seed: npr.SeedSequence, antithetic: bool = False) -> None:
+        self._generator = npr.Generator(npr.PCG64(seed))
+        self._antithetic: bool = antithetic
+
+    def random(self, size: int | None = None) -> Any:
+        u = self._generator.random(size)
+        return 1 - u if self._antithetic else u
+
+    def triangular(self, left: float, mode: float, right: float) -> float:
+        # same inversion as npr.Generator.triangular()
+        u: float = self.random()
+        base: float = right - left
+        if u <= (mode - left) / base:
+            return left + math.sqrt(u * ((mode - left) * base))
+        return right - math.sqrt((1.0 - u) * ((right - mode) * base))
+
+    def geometric(self, p: float) -> int:
+        # number of trials until the first success, u = 1 only happens in the antithetic stream
+        u: float = min(self.random(), math.nextafter(1.0, 0.0))
+        if p == 1:
+            return 1
+        return max(1, math.ceil(math.log1p(-u) / math.log1p(-p)))
+
+
 class LoadGenerator:
-    def __init__(self, instructions_peak_distrib: int, max_instructions: int, gen_prob: float, seed: int | None = None) -> None:
-        self._insts_generator = npr.Generator(npr.PCG64(seed))
-        self._task_generator = npr.Generator(npr.PCG64(seed))
+    # streams replace the generators of the arrivals and of the instructions seeded by seed
+    def __init__(self, instructions_peak_distrib: int, max_instructions: int, gen_prob: float, seed: int | None = None,
+                 arrival: ArrivalProcess | None = None, streams: tuple[UniformStream, UniformStream] | None = None) -> None:
+        self._insts_generator = npr.Generator(npr.PCG64(seed)) if streams is None else streams[1]
+        self._task_generator = npr.Generator(npr.PCG64(seed)) if streams is None else streams[0]
         self._insts_peak_distrib: int = instructions_peak_distrib
         self._max_instructions: int = max_instructions
         self._uuid: int = -1
         self._gen_prob: float = gen_prob
 
+        # without arrival process, a task arrives in each slot with probability 1 - gen_prob,
+        # the process may keep a state (e.g. the period of BurstyArrivals) so each generator
+        # has its own copy, the generators given the same process draw the same arrivals
+        self._arrival: ArrivalProcess | None = copy.deepcopy(arrival)
+        self._slot: int = 0
+        self._next_arrival: int | None = None
+
+    @staticmethod
+    def common(instructions_peak_distrib: int, max_instructions: int, gen_prob: float, seed: int, repetition: int,
+               arrival: ArrivalProcess | None = None, antithetic: bool = False) -> LoadGenerator:
+        # common random numbers: the workload of a repetition only depends on the seed and
+        # the repetition, whatever the variant and the draws of the previous repetitions,
+        # the arrivals and the instructions have independent streams so that a variant
+        # drawing one more arrival does not shift the instructions,
+        # with antithetic, the repetitions 2k and 2k+1 are an antithetic pair
+        key: int = repetition // 2 if antithetic else repetition
+        flipped: bool = antithetic and repetition % 2 == 1
+        tasks_seed, insts_seed = npr.SeedSequence(seed, spawn_key=(key,)).spawn(2)
+        return LoadGenerator(instructions_peak_distrib, max_instructions, gen_prob, arrival=arrival,
+                             streams=(UniformStream(tasks_seed, flipped), UniformStream(insts_seed, flipped)))
+
+    @property
+    def arrival_rate(self) -> float:
+        # mean number of tasks arriving per slot
+        return self._arrival.mean_rate if self._arrival is not None else 1 - self._gen_prob
+
+    @property
+    def instructions_peak_distrib(self) -> int:
+        return self._insts_peak_distrib
+
+    @property
+    def max_instructions(self) -> int:
+        return self._max_instructions
+
+    @property
+    def mean_instructions(self) -> float:
+        # mean of the triangular distribution of the task sizes
+        return (10 + self._insts_peak_distrib + self._max_instructions) / 3
+
     def _generate_random_task(self) -> Task:
         insts: int = int(self._insts_generator.triangular(
             10, self._insts_peak_distrib, self._max_instructions))
@@ -25,5 +102,28 @@ class LoadGenerator:
         return self
 
     def gen(self) -> None | Task:
+        if self._arrival is not None:
+            arrivals = self.gen_batch(1)
+            return arrivals[0][1] if arrivals else None
+        self._slot += 1
         if self._task_generator.random() >= self._gen_prob:
             return self._generate_random_task()
+
+    def gen_batch(self, n: int) -> list[tuple[int, Task]]:
+        # equivalent to n successive calls to gen(),
+        # returns the index of the calls that created a task along with it
+        if self._arrival is None:
+            self._slot += n
+            draws = self._task_generator.random(n)
+            return [(int(i), self._generate_random_task()) for i in (draws >= self._gen_prob).nonzero()[0]]
+
+        if self._next_arrival is None:
+            self._next_arrival = self._arrival.next_arrival(self._task_generator, self._slot - 1)
+
+        start: int = self._slot
+        self._slot += n
+        arrivals: list[tuple[int, Task]] = []
+        while self._next_arrival < self._slot:
+            arrivals.append((self._next_arrival - start, self._generate_random_task()))
+            self._next_arrival = self._arrival.next_arrival(self._task_generator, self._next_arrival)
+        return arrivals
@@ -0,0 +1,277 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from scheduler import LoadGenerator
+    from energy_model import EnergyModel
+    from cpu import PerfDom
+
+import bisect
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+
+from scheduler import Task, Clock, EAS, RunQueue
+from scheduler.eas import execute_tick
+from profiler import Profiler
+from cpu import CPU
+
+# command sent to the shard owning the CPU: (tick within the run message, kind, CPU index, payload)
+# kind is "insert" (payload is the task) or "kernel" (payload is the (kind, cycles) kernel debt)
+_Command = tuple[int, str, int, Task | tuple[str, int]]
+
+
+class _ShardRunQueue:
+    # run queue seen by the coordinator, its capacity and size are read from the
+    # shared memory written by the owning shard and the operations are forwarded to it
+    def __init__(self, engine: ShardedEAS, index: int) -> None:
+        self._engine: ShardedEAS = engine
+        self._index: int = index
+
+    @property
+    def size(self) -> int:
+        return self._engine._sizes[self._index]
+
+    @property
+    def cap(self) -> int:
+        return self._engine._caps[self._index]
+
+    def insert(self, task: Task) -> None:
+        self._engine._caps[self._index] += task.remaining_cycles
+        self._engine._sizes[self._index] += 1
+        self._engine._post(self._index, "insert", task)
+
+    def add_kernel_debt(self, kind: str, cycles: int) -> None:
+        self._engine._caps[self._index] += cycles
+        self._engine._post(self._index, "kernel", (kind, cycles))
+
+    def pop_highest_vr(self) -> None | Task:
+        return self._engine._pop_highest_vr(self._index)
+
+
+class ShardedEAS:
+    # runs a scheduler with its CPUs partitioned across worker processes,
+    # each shard owns the run queues and a profiler of its CPUs while the
+    # coordinator draws the arrivals and runs the scheduler decisions
+    # (wake-up balancer, over-utilization, load balancer) on a view of the
+    # run queues synchronized through shared memory
+    #
+    # with window_ticks == 1 each tick is split at the CPUs where a task
+    # arrives, so that the results are exactly those of EAS.run(),
+    # with window_ticks > 1 the shards only synchronize every window: the tasks
+    # arriving in a window are placed at its start with the run queues of that
+    # instant and enqueued at their arrival tick, the load balancer only runs
+    # on windows starting on a multiple of 1000ms
+    #
+    # partition is "domain" (one shard per perf domain) or "interleaved"
+    # (CPU i on shard i % nbr_shards), the latter balances the work of the
+    # sub-tick phases of window_ticks == 1 better
+    def __init__(self, scheduler: type[EAS], load_gen: LoadGenerator, cpus: list[CPU], em: EnergyModel,
+                 nbr_shards: int | None = None, window_ticks: int = 1, partition: str = "domain", **kwargs: Any) -> None:
+        self._sched: EAS = scheduler(load_gen, cpus, em, **kwargs)
+        self._load_gen: LoadGenerator = load_gen
+        self._cpus: list[CPU] = cpus
+        self._window: int = window_ticks
+        self._period: int = self._sched._sched_tick_period
+        assert(window_ticks == 1 or 1000 % (window_ticks * self._period) == 0)
+
+        self._shard_of: list[int] = []
+        match partition:
+            case "domain":
+                domains: list[PerfDom] = self._sched._perf_domains_name
+                self._shard_of = [domains.index(cpu.type) for cpu in cpus]
+                self._nbr_shards: int = len(domains)
+            case "interleaved":
+                self._nbr_shards = nbr_shards if nbr_shards is not None else multiprocessing.cpu_count()
+                self._shard_of = [i % self._nbr_shards for i in range(len(cpus))]
+            case _:
+                raise ValueError(f"unknown partition {partition}")
+
+        self._owned: list[list[int]] = [[i for i in range(len(cpus)) if self._shard_of[i] == shard]
+                                        for shard in range(self._nbr_shards)]
+        self._sched._run_queues = {cpu: _ShardRunQueue(self, i) for i, cpu in enumerate(cpus)}  # type: ignore
+        self._commands: list[list[_Command]] = [[] for _ in range(self._nbr_shards)]
+        self._tick: int = 0
+        self._has_run: bool = False
+
+    @property
+    def profiler(self) -> Profiler:
+        return self._sched.profiler
+
+    def _post(self, index: int, kind: str, payload: Task | tuple[str, int]) -> None:
+        self._commands[self._shard_of[index]].append((self._tick, kind, index, payload))
+
+    def _pop_highest_vr(self, index: int) -> None | Task:
+        shard: int = self._shard_of[index]
+        self._conns[shard].send(("pop", index, self._commands[shard]))
+        self._commands[shard] = []
+        return self._conns[shard].recv()
+
+    def _run_shards(self, lo: int, hi: int, ticks: int, advance: bool) -> None:
+        # execute the CPUs lo..hi-1 for some ticks, the shards without work are skipped
+        running: list[Connection] = []
+        for shard, conn in enumerate(self._conns):
+            owned: list[int] = self._owned[shard]
+            first: int = bisect.bisect_left(owned, lo)
+            if advance or self._commands[shard] or (first < len(owned) and owned[first] < hi):
+                conn.send(("run", lo, hi, ticks, advance, self._commands[shard]))
+                self._commands[shard] = []
+                running.append(conn)
+        for conn in running:
+            conn.recv()
+
+    def run(self, time: int) -> None:
+        # the run queues only live as long as the shard processes
+        assert(not self._has_run)
+        self._has_run = True
+
+        nbr_cpus: int = len(self._cpus)
+        caps_memory = SharedMemory(create=True, size=8 * nbr_cpus)
+        sizes_memory = SharedMemory(create=True, size=8 * nbr_cpus)
+        self._caps = caps_memory.buf.cast("q")
+        self._sizes = sizes_memory.buf.cast("q")
+        for i in range(nbr_cpus):
+            self._caps[i] = 0
+            self._sizes[i] = 0
+
+        self._conns: list[Connection] = []
+        processes: list[multiprocessing.Process] = []
+        for shard in range(self._nbr_shards):
+            owned: list[tuple[int, CPU]] = [(i, CPU(cpu.type, cpu.pstates, cpu.name))
+                                            for i, cpu in enumerate(self._cpus) if self._shard_of[i] == shard]
+            conn, shard_conn = multiprocessing.Pipe()
+            proc = multiprocessing.Process(target=_shard_main, args=[
+                shard_conn, owned, caps_memory.name, sizes_memory.name, self._period, self._sched._clock.time])
+            proc.start()
+            self._conns.append(conn)
+            processes.append(proc)
+
+        try:
+            if self._window == 1:
+                self._run_exact(time)
+            else:
+                self._run_windows(time)
+
+            # the energy of a CPU name is the one seen by the shard of the last CPU
+            # bearing it, as it is the last to update it at each tick
+            energy_shard: dict[str, int] = {cpu.name: self._shard_of[i] for i, cpu in enumerate(self._cpus)}
+            for shard, conn in enumerate(self._conns):
+                conn.send(("stop",))
+                shard_profiler: Profiler = conn.recv()
+                self.profiler.merge_shard(shard_profiler, {name for name, owner in energy_shard.items() if owner == shard})
+        finally:
+            # closing the pipes also stops the shards left running by an error
+            for conn in self._conns:
+                conn.close()
+            for proc in processes:
+                proc.join()
+            self._caps.release()
+            self._sizes.release()
+            for memory in (caps_memory, sizes_memory):
+                memory.close()
+                memory.unlink()
+
+    def _balance(self) -> None:
+        sched: EAS = self._sched
+        if sched._clock.time % 1000 == 0:
+            sched._over_utilized = sched._is_over_utilized()
+            if sched._over_utilized:
+                sched._load_balancer()
+
+    def _run_exact(self, time: int) -> None:
+        sched: EAS = self._sched
+        nbr_cpus: int = len(self._cpus)
+        while sched._clock.time < time:
+            self._balance()
+
+            lo: int = 0
+            for i, new_task in self._load_gen.gen_batch(nbr_cpus):
+                if i > lo:
+                    self._run_shards(lo, i, 1, False)
+                    lo = i
+                sched.profiler.new_task(new_task)
+                best_cpu: CPU = sched._wake_up_balancer(self._cpus[i], new_task)
+                sched._run_queues[best_cpu].insert(new_task)
+            self._run_shards(lo, nbr_cpus, 1, True)
+
+            sched._clock.inc_ms(self._period)
+
+    def _run_windows(self, time: int) -> None:
+        sched: EAS = self._sched
+        nbr_cpus: int = len(self._cpus)
+        while sched._clock.time < time:
+            start: int = sched._clock.time
+            ticks: int = min(self._window, -(-(time - start) // self._period))
+            self._balance()
+
+            for i, new_task in self._load_gen.gen_batch(ticks * nbr_cpus):
+                self._tick = i // nbr_cpus
+                sched.profiler.new_task(new_task)
+                new_task.arrive(start + self._tick * self._period)
+                best_cpu: CPU = sched._wake_up_balancer(self._cpus[i % nbr_cpus], new_task)
+                sched._run_queues[best_cpu].insert(new_task)
+            self._tick = 0
+            self._run_shards(0, nbr_cpus, ticks, True)
+
+            sched._clock.inc_ms(ticks * self._period)
+
+
+def _shard_main(conn: Connection, owned: list[tuple[int, CPU]], caps_name: str, sizes_name: str, period: int, time: int) -> None:
+    clock = Clock()
+    clock.inc_ms(time)
+    profiler = Profiler(clock)
+    idle_task = Task(-1, "idle", enforce=False)
+    indexes: list[int] = [i for i, _ in owned]
+    run_queues: dict[int, RunQueue] = {i: RunQueue() for i in indexes}
+    for _, cpu in owned:
+        cpu.start(profiler)
+
+    caps_memory = SharedMemory(name=caps_name)
+    sizes_memory = SharedMemory(name=sizes_name)
+    caps = caps_memory.buf.cast("q")
+    sizes = sizes_memory.buf.cast("q")
+
+    def apply(commands: list[_Command], tick: int, start: int) -> int:
+        # apply the commands of the tick from start, returns the next one
+        while start < len(commands) and commands[start][0] == tick:
+            _, kind, index, payload = commands[start]
+            if kind == "insert":
+                run_queues[index].insert(payload)  # type: ignore
+            else:
+                run_queues[index].add_kernel_debt(*payload)  # type: ignore
+            start += 1
+        return start
+
+    def publish() -> None:
+        for i, queue in run_queues.items():
+            caps[i] = queue.cap
+            sizes[i] = queue.size
+
+    while True:
+        message = conn.recv()
+        if message[0] == "stop":
+            conn.send(profiler)
+            break
+
+        if message[0] == "pop":
+            _, index, commands = message
+            apply(commands, 0, 0)
+            task: Task | None = run_queues[index].pop_highest_vr()
+            publish()
+            conn.send(task)
+            continue
+
+        _, lo, hi, ticks, advance, commands = message
+        next_command: int = 0
+        for tick in range(ticks):
+            next_command = apply(commands, tick, next_command)
+            for i, cpu in owned[bisect.bisect_left(indexes, lo):bisect.bisect_left(indexes, hi)]:
+                execute_tick(cpu, run_queues[i], idle_task, profiler, clock.time, period)
+            if advance:
+                clock.inc_ms(period)
+        publish()
+        conn.send(None)
+
+    caps.release()
+    sizes.release()
+    caps_memory.close()
+    sizes_memory.close()
@@ -7,11 +7,19 @@ class Task:
         self._terminated: bool = False
         self._name: Any = name
         self._enforce: bool = enforce
+        # timestamps in ms, -1 until the event happens
+        self._arrival_time: int = -1
+        self._start_time: int = -1
     
     @property
     def name(self) -> str:
         return str(self._name)
 
+    @property
+    def uuid(self) -> int:
+        # number of the tasks of the load generator, -1 for the kernel tasks
+        return self._name if isinstance(self._name, int) else -1
+
     @property
     def remaining_cycles(self) -> int:
         return self._remaining
@@ -24,6 +32,20 @@ class Task:
     def executed_cycles(self) -> int:
         return self._cycles - self._remaining
 
+    @property
+    def arrival_time(self) -> int:
+        return self._arrival_time
+
+    @property
+    def start_time(self) -> int:
+        return self._start_time
+
+    def arrive(self, time_ms: int) -> None:
+        self._arrival_time = time_ms
+
+    def start(self, time_ms: int) -> None:
+        self._start_time = time_ms
+
     @property
     def terminated(self) -> bool:
         return self._terminated
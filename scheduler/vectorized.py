@@ -0,0 +1,272 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any
+if TYPE_CHECKING:
+    from scheduler import LoadGenerator
+    from energy_model import EnergyModel
+    from profiler import Profiler, Tracer
+    from cpu import CPU
+
+import math
+import numpy as np
+
+from scheduler import Task, EAS, RunQueue
+from scheduler.eas import kernel_task
+
+# index of the cycles_hist of the profiler by task name, the other tasks are common ones
+_KINDS: dict[str, int] = {"energy": 1, "balance": 2}
+_IDLE: int = 3
+_SLACK: int = 4
+
+
+class _VectorRunQueue(RunQueue):
+    # run queue whose next task to execute may be held by the engine arrays (the head),
+    # the head stands for a task that EAS.run() would have inserted back as the only
+    # task of the queue and popped at the next tick, it is inserted for real as soon
+    # as the queue is modified, the capacity includes it and is kept by the engine
+    def __init__(self, engine: VectorizedEAS, index: int) -> None:
+        super().__init__()
+        self._engine: VectorizedEAS = engine
+        self._index: int = index
+
+    @property
+    def size(self) -> int:
+        return len(self._queue) + (self._engine._heads[self._index] is not None)
+
+    @property
+    def cap(self) -> int:
+        return int(self._engine._caps[self._index])
+
+    def insert(self, task: Task) -> None:
+        self._engine._insert_head(self._index)
+        self._engine._caps[self._index] += task.remaining_cycles
+        super().insert(task)
+        self._engine._queued[self._index] = True
+
+    def add_kernel_debt(self, kind: str, cycles: int) -> None:
+        self._engine._insert_head(self._index)
+        self._engine._caps[self._index] += cycles
+        super().add_kernel_debt(kind, cycles)
+        self._engine._queued[self._index] = True
+
+    def pop_highest_vr(self) -> None | Task:
+        self._engine._insert_head(self._index)
+        task: Task | None = super().pop_highest_vr()
+        if task is not None:
+            self._engine._caps[self._index] -= task.remaining_cycles
+        self._engine._queued[self._index] = self.queued
+        return task
+
+    @property
+    def queued(self) -> bool:
+        # whether a task or a kernel debt is waiting besides the head
+        return len(self._queue) != 0 or len(self._kernel_debt) != 0
+
+
+class VectorizedEAS:
+    # runs a scheduler with the per-tick execution of all the CPUs done by array
+    # operations: the task to execute on each CPU (the head), its remaining cycles
+    # and the cycles of the P-state of each CPU are held in aligned arrays,
+    # only the CPUs whose run queue holds more than one task, and the tasks that
+    # start or terminate, still go through Python at each tick
+    #
+    # each tick is split at the CPUs where a task arrives as in EAS.run(), so that
+    # the scheduler decisions see the same run queues and the results are exactly
+    # those of EAS.run(), the telemetry is not sampled
+    def __init__(self, scheduler: type[EAS], load_gen: LoadGenerator, cpus: list[CPU], em: EnergyModel, **kwargs: Any) -> None:
+        self._sched: EAS = scheduler(load_gen, cpus, em, **kwargs)
+        self._load_gen: LoadGenerator = load_gen
+        self._cpus: list[CPU] = cpus
+        self._period: int = self._sched._sched_tick_period
+        nbr_cpus: int = len(cpus)
+
+        # P-states of each CPU padded to the longest table, the padded capacities are never selected
+        nbr_pstates: int = max(len(cpu.pstates) for cpu in cpus)
+        self._pstate_caps: np.ndarray = np.full((nbr_cpus, nbr_pstates), np.iinfo(np.int64).max, np.int64)
+        self._pstate_cycles: np.ndarray = np.zeros((nbr_cpus, nbr_pstates), np.int64)
+        self._pstate_power: np.ndarray = np.zeros((nbr_cpus, nbr_pstates), np.int64)
+        for i, cpu in enumerate(cpus):
+            for j, pstate in enumerate(cpu.pstates):
+                self._pstate_caps[i, j] = pstate[0]
+                self._pstate_cycles[i, j] = math.ceil(pstate[0] * self._period * 10**-3)
+                self._pstate_power[i, j] = pstate[1]
+        self._last_pstate: np.ndarray = np.asarray([len(cpu.pstates) - 1 for cpu in cpus], np.int64)
+        self._pstates: np.ndarray = np.zeros(nbr_cpus, np.int64)
+
+        self._caps: np.ndarray = np.zeros(nbr_cpus, np.int64)
+        self._queued: np.ndarray = np.zeros(nbr_cpus, np.bool_)
+        self._has_head: np.ndarray = np.zeros(nbr_cpus, np.bool_)
+        self._remaining: np.ndarray = np.zeros(nbr_cpus, np.int64)
+        # remaining cycles of the head last written to its task
+        self._synced: np.ndarray = np.zeros(nbr_cpus, np.int64)
+        self._kinds: np.ndarray = np.zeros(nbr_cpus, np.int64)
+        self._heads: list[Task | None] = [None] * nbr_cpus
+
+        self._queues: list[_VectorRunQueue] = [_VectorRunQueue(self, i) for i in range(nbr_cpus)]
+        self._sched._run_queues = dict(zip(cpus, self._queues))  # type: ignore
+
+        # the profiler keeps the power of each CPU name, the CPUs sharing a name
+        # overwrite it in turn at each tick so it is the one of the last of them
+        names: list[Any] = list(dict.fromkeys(cpu.name for cpu in cpus))
+        self._names: list[Any] = names
+        self._last_of_name: np.ndarray = np.asarray(
+            [max(i for i, cpu in enumerate(cpus) if cpu.name == name) for name in names], np.int64)
+
+    @property
+    def profiler(self) -> Profiler:
+        return self._sched.profiler
+
+    @property
+    def time(self) -> int:
+        return self._sched.time
+
+    def enable_tracing(self, tracer: Tracer) -> None:
+        self._sched.enable_tracing(tracer)
+
+    @staticmethod
+    def _execute_task(task: Task, cycles: int) -> None:
+        try:
+            task.execute(cycles)
+        except AssertionError:
+            # a terminated task went below 0, as in CPU.execute_cycles()
+            pass
+
+    def _insert_head(self, i: int) -> None:
+        # the insertion that EAS.run() did at the end of the last execution
+        if self._heads[i] is not None:
+            self._insert_heads(np.asarray([i]))
+
+    def _insert_heads(self, indexes: np.ndarray) -> None:
+        executed: list[int] = (self._synced[indexes] - self._remaining[indexes]).tolist()
+        for i, cycles in zip(indexes.tolist(), executed):
+            task: Task = self._heads[i]  # type: ignore
+            if cycles != 0:
+                self._execute_task(task, cycles)
+            RunQueue.insert(self._queues[i], task)
+            self._heads[i] = None
+        self._has_head[indexes] = False
+        self._queued[indexes] = True
+
+    def _pop_heads(self, indexes: np.ndarray, time: int) -> list[tuple[int, str, int]]:
+        # returns the (CPU index, kind, cycles) of the heads that are kernel debts,
+        # their task is None
+        remaining: list[int] = []
+        kinds: list[int] = []
+        queued: list[bool] = []
+        debts: list[tuple[int, str, int]] = []
+        for i in indexes.tolist():
+            queue: _VectorRunQueue = self._queues[i]
+            debt: tuple[str, int] | None = queue.pop_kernel_debt()
+            if debt is not None:
+                self._heads[i] = None
+                remaining.append(debt[1])
+                kinds.append(_KINDS[debt[0]])
+                queued.append(queue.queued)
+                debts.append((i, debt[0], debt[1]))
+                continue
+            task: Task = queue.pop_smallest_vr()  # type: ignore
+            self._heads[i] = task
+            remaining.append(task.remaining_cycles)
+            kinds.append(_KINDS.get(task.name, 0))
+            queued.append(queue.queued)
+            if task.start_time < 0:
+                self.profiler.start_task(task, time)
+        self._has_head[indexes] = True
+        self._remaining[indexes] = self._synced[indexes] = remaining
+        self._kinds[indexes] = kinds
+        self._queued[indexes] = queued
+        return debts
+
+    def _end_heads(self, indexes: np.ndarray, time: int) -> None:
+        executed: list[int] = (self._synced[indexes] - self._remaining[indexes]).tolist()
+        for i, cycles, kind in zip(indexes.tolist(), executed, self._kinds[indexes].tolist()):
+            task: Task | None = self._heads[i]
+            if task is None:
+                # kernel debt
+                continue
+            self._execute_task(task, cycles)
+            if kind == 0:
+                self.profiler.end_task(task, time)
+            self._heads[i] = None
+        self._has_head[indexes] = False
+
+    def _execute(self, lo: int, hi: int) -> None:
+        # one tick of the CPUs lo..hi-1, as the body of EAS.run() for each of them
+        time: int = self._sched._clock.time
+        popped: np.ndarray = np.flatnonzero(self._queued[lo:hi] & ~self._has_head[lo:hi])
+        debts: list[tuple[int, str, int]] = self._pop_heads(popped + lo, time) if len(popped) != 0 else []
+
+        caps: np.ndarray = self._caps[lo:hi]
+        running: np.ndarray = self._has_head[lo:hi].copy()
+        remaining: np.ndarray = self._remaining[lo:hi]
+
+        # Schedutil: the first P-state above the capacity, or the highest
+        pstates: np.ndarray = np.minimum((self._pstate_caps[lo:hi] <= caps[:, None]).sum(axis=1), self._last_pstate[lo:hi])
+        self._pstates[lo:hi] = pstates
+        cycles: np.ndarray = np.take_along_axis(self._pstate_cycles[lo:hi], pstates[:, None], axis=1)[:, 0]
+
+        executed: np.ndarray = np.where(running, np.minimum(remaining, cycles), 0)
+        self._cycles[_IDLE] += int(cycles[~running].sum())
+        self._cycles[_SLACK] += int((cycles - executed)[running].sum())
+        np.add.at(self._cycles, self._kinds[lo:hi][running], executed[running])
+        caps -= executed
+        remaining -= np.where(running, cycles, 0)
+
+        # the kernel debts longer than the tick go on as tasks, as in EAS.run()
+        for i, kind, kernel_cycles in debts:
+            if self._remaining[i] > 0:
+                self._heads[i] = kernel_task(kind, kernel_cycles, int(self._remaining[i]))
+                self._synced[i] = self._remaining[i]
+
+        ended: np.ndarray = np.flatnonzero(running & (remaining <= 0))
+        if len(ended) != 0:
+            self._end_heads(ended + lo, time + self._period)
+        # the heads of the CPUs with other tasks are inserted back, EAS.run() picks again at the next tick
+        reinserted: np.ndarray = np.flatnonzero(self._has_head[lo:hi] & self._queued[lo:hi])
+        if len(reinserted) != 0:
+            self._insert_heads(reinserted + lo)
+
+    def _account_power(self) -> None:
+        # each name is charged the power set at the previous tick until now,
+        # then takes the P-state of the last CPU bearing it
+        time: int = self._sched._clock.time
+        self._energy += self._power * (time - self._power_time)
+        self._power_time[:] = time
+        self._power = self._pstate_power[self._last_of_name, self._pstates[self._last_of_name]]
+
+    def run(self, time: int) -> None:
+        sched: EAS = self._sched
+        profiler: Profiler = sched.profiler
+        nbr_cpus: int = len(self._cpus)
+
+        self._cycles: np.ndarray = np.zeros(5, np.int64)
+        consumptions: list[tuple[int, int, int]] = [profiler.power_consumption(name) for name in self._names]
+        self._power: np.ndarray = np.asarray([power for power, _, _ in consumptions], np.int64)
+        self._power_time: np.ndarray = np.asarray([timestamp for _, timestamp, _ in consumptions], np.int64)
+        self._energy: np.ndarray = np.asarray([energy for _, _, energy in consumptions], np.int64)
+
+        while sched._clock.time < time:
+            if sched._clock.time % 1000 == 0:
+                sched._over_utilized = sched._is_over_utilized()
+                if sched._over_utilized:
+                    sched._load_balancer()
+
+            lo: int = 0
+            for i, new_task in self._load_gen.gen_batch(nbr_cpus):
+                if i > lo:
+                    self._execute(lo, i)
+                    lo = i
+                profiler.new_task(new_task)
+                best_cpu: CPU = sched._wake_up_balancer(self._cpus[i], new_task)
+                sched._run_queues[best_cpu].insert(new_task)
+            self._execute(lo, nbr_cpus)
+            self._account_power()
+
+            sched._clock.inc_ms(self._period)
+
+        # leave the tasks, the CPUs and the profiler as EAS.run() does
+        self._insert_heads(np.flatnonzero(self._has_head))
+        for cpu, pstate in zip(self._cpus, self._pstates):
+            cpu._pstate = cpu.pstates[pstate]
+        profiler.add_cycles([int(cycles) for cycles in self._cycles])
+        for name, power, timestamp, energy in zip(self._names, self._power, self._power_time, self._energy):
+            profiler.set_power_consumption(name, int(power), int(timestamp), int(energy))
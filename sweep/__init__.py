@@ -0,0 +1,45 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any
+if TYPE_CHECKING:
+    from sweep.store import ColumnStore, ColumnTable, load_store, load_stores, job_run
+    from sweep.report import write_differences, write_placement, write_latency, write_variance, write_grid_reports, write_store_reports
+    from sweep.halving import SuccessiveHalving, threshold_candidates, write_rungs
+
+import importlib
+
+from sweep.grid import Grid, Job, topology_name, variant_name, PICK_DISTRIB_INTS, MAX_DISTRIB_INSTS, CREATE_TASK_PROB, \
+    calibration_count_limits
+from sweep.ledger import Ledger
+from sweep.job import run_job, profiler_metrics, arrival_process
+from sweep.queue import WorkQueue, work
+from sweep.progress import Progress, ProgressSlot
+
+# the store, the reports and the halving need NumPy, they are only imported on first use
+_LAZY_MODULES: dict[str, str] = {
+    "ColumnStore": "sweep.store",
+    "ColumnTable": "sweep.store",
+    "load_store": "sweep.store",
+    "load_stores": "sweep.store",
+    "job_run": "sweep.store",
+    "write_differences": "sweep.report",
+    "write_placement": "sweep.report",
+    "write_latency": "sweep.report",
+    "write_variance": "sweep.report",
+    "write_grid_reports": "sweep.report",
+    "write_store_reports": "sweep.report",
+    "SuccessiveHalving": "sweep.halving",
+    "threshold_candidates": "sweep.halving",
+    "write_rungs": "sweep.halving",
+}
+
+__all__ = ["Grid", "Job", "topology_name", "variant_name", "PICK_DISTRIB_INTS", "MAX_DISTRIB_INSTS", "CREATE_TASK_PROB",
+           "calibration_count_limits", "Ledger", "run_job", "profiler_metrics", "arrival_process",
+           "WorkQueue", "work", "Progress", "ProgressSlot", *_LAZY_MODULES]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value: Any = getattr(importlib.import_module(_LAZY_MODULES[name]), name)
+    globals()[name] = value
+    return value
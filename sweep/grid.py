@@ -0,0 +1,122 @@
+from __future__ import annotations
+from typing import Any
+
+import itertools
+import json
+import math
+
+# load of run-scheduling-exp.py, shared by the scripts simulating or screening it
+PICK_DISTRIB_INTS: int = math.floor(0.1 * 10**9)
+MAX_DISTRIB_INSTS: int = math.floor(4 * 10**9)
+CREATE_TASK_PROB: float = 0.999
+
+
+def calibration_count_limits(nbr_cpus: int) -> range:
+    # count limits of EASOverutilManycores tried by the calibrations
+    return range(2, int(nbr_cpus / 2) + 2)
+
+
+class Job:
+    # one simulation of one scheduler variant on one topology, load and seed
+    def __init__(self, topology: dict[str, int], variant: dict[str, Any], load: tuple[int, int, float],
+                 seed: int, duration_ms: int, coarse_tick_ms: int | None = None, arrival: dict[str, Any] | None = None) -> None:
+        self.topology: dict[str, int] = topology
+        self.variant: dict[str, Any] = variant
+        self.load: tuple[int, int, float] = load
+        self.seed: int = seed
+        self.duration_ms: int = duration_ms
+        self.coarse_tick_ms: int | None = coarse_tick_ms
+        self.arrival: dict[str, Any] | None = arrival
+
+    @property
+    def topology_name(self) -> str:
+        return topology_name(self.topology)
+
+    @property
+    def variant_name(self) -> str:
+        return variant_name(self.variant)
+
+    @property
+    def load_name(self) -> str:
+        return "{}_{}_{}".format(*self.load)
+
+    @property
+    def key(self) -> str:
+        key: str = "{}/{}/{}/{}/{}/{}".format(self.topology_name, self.variant_name, self.load_name,
+                                              self.seed, self.duration_ms, self.coarse_tick_ms)
+        if self.arrival is not None:
+            key += "/" + json.dumps(self.arrival, sort_keys=True)
+        return key
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "topology": self.topology,
+            "variant": self.variant,
+            "load": list(self.load),
+            "seed": self.seed,
+            "duration_ms": self.duration_ms,
+            "coarse_tick_ms": self.coarse_tick_ms,
+            "arrival": self.arrival,
+        }
+
+    @staticmethod
+    def from_dict(job: dict[str, Any]) -> Job:
+        return Job(job["topology"], job["variant"], tuple(job["load"]),  # type: ignore
+                   job["seed"], job["duration_ms"], job["coarse_tick_ms"], job.get("arrival"))
+
+
+def topology_name(topology: dict[str, int]) -> str:
+    return "_".join(f"{topology[kind]}_{kind}" for kind in ("little", "middle", "big") if topology.get(kind, 0) > 0)
+
+
+def variant_name(variant: dict[str, Any]) -> str:
+    return variant.get("name", variant["class"])
+
+
+class Grid:
+    # grid spec: topologies x variants x load parameters x seeds, e.g.
+    # {
+    #   "duration_ms": 60000,
+    #   "topologies": [{"little": 2, "middle": 2}],
+    #   "variants": ["EAS", {"class": "EASOverutilManycores", "name": "EASOverutil2cores", "count_limit": 2}],
+    #   "pick_distrib_insts": [100000000], "max_distrib_insts": [4000000000], "create_task_prob": [0.999],
+    #   "seeds": {"start": 1, "count": 100},
+    #   "arrival": {"process": "BurstyArrivals", "calm_rate": 0.0005, "burst_rate": 0.01, "mean_calm_slots": 50000, "mean_burst_slots": 5000}
+    # }
+    # without arrival, a task arrives in each slot with probability 1 - create_task_prob
+    # the first variant is the baseline the others are compared to
+    def __init__(self, spec: dict[str, Any]) -> None:
+        self.duration_ms: int = spec.get("duration_ms", 60000)
+        self.coarse_tick_ms: int | None = spec.get("coarse_tick_ms")
+        self.arrival: dict[str, Any] | None = spec.get("arrival")
+        self.topologies: list[dict[str, int]] = spec["topologies"]
+        self.variants: list[dict[str, Any]] = [
+            {"class": variant} if isinstance(variant, str) else variant for variant in spec["variants"]]
+        self.loads: list[tuple[int, int, float]] = list(itertools.product(
+            spec["pick_distrib_insts"], spec["max_distrib_insts"], spec["create_task_prob"]))
+
+        seeds: list[int] | dict[str, int] = spec["seeds"]
+        if isinstance(seeds, dict):
+            self.seeds: list[int] = list(range(seeds["start"], seeds["start"] + seeds["count"]))
+        else:
+            self.seeds = seeds
+
+    @staticmethod
+    def load(file_name: str) -> Grid:
+        with open(file_name) as f:
+            return Grid(json.load(f))
+
+    @property
+    def baseline(self) -> str:
+        return variant_name(self.variants[0])
+
+    def jobs(self) -> list[Job]:
+        # seeds vary last so that the jobs of a same repetition are close to each other
+        return [Job(topology, variant, load, seed, self.duration_ms, self.coarse_tick_ms, self.arrival)
+                for topology, load, seed, variant in itertools.product(self.topologies, self.loads, self.seeds, self.variants)]
+
+    def output_suffix(self, topology: dict[str, int], load: tuple[int, int, float]) -> str:
+        # same file names as run-scheduling-exp.py when there is a single load
+        if len(self.loads) == 1:
+            return topology_name(topology)
+        return "{}_{}_{}_{}".format(topology_name(topology), *load)
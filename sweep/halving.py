@@ -0,0 +1,146 @@
+from __future__ import annotations
+from typing import Any, Iterable, TYPE_CHECKING
+if TYPE_CHECKING:
+    from sweep.store import ColumnStore
+
+import math
+import multiprocessing
+import numpy as np
+
+from sweep.grid import Job, variant_name
+from sweep.job import run_job
+from sweep.report import append_difference
+from sweep.store import job_run
+
+
+def _run(job: Job) -> tuple[Job, dict[str, Any]]:
+    return job, run_job(job)
+
+
+def threshold_candidates(count_limits: Iterable[int], lower_limits: Iterable[float],
+                         upper_limits: Iterable[float]) -> list[dict[str, Any]]:
+    # variants of every count limit and pair of load limits, a lower limit not below
+    # the upper one disables the hysteresis so only one is kept: it is then the
+    # EASOverutilManycores of the exhaustive calibration of run-scheduling-exp.py
+    # (over-utilized above the limit, with the same name at 80%), and otherwise
+    # EASOverutilTwolimitsManycores (over-utilized from the upper limit on)
+    candidates: list[dict[str, Any]] = []
+    for count_limit in count_limits:
+        for upper_limit in upper_limits:
+            for lower_limit in sorted({min(lower_limit, upper_limit) for lower_limit in lower_limits}):
+                if lower_limit == upper_limit:
+                    candidates.append({
+                        "class": "EASOverutilManycores",
+                        "name": f"EASOverutil{count_limit}cores" + ("" if upper_limit == 80 else f"{upper_limit:g}"),
+                        "count_limit": count_limit,
+                        "load_limit": upper_limit,
+                    })
+                    continue
+                candidates.append({
+                    "class": "EASOverutilTwolimitsManycores",
+                    "name": f"EASOverutil{count_limit}cores{lower_limit:g}to{upper_limit:g}",
+                    "count_limit": count_limit,
+                    "lower_limit": lower_limit,
+                    "upper_limit": upper_limit,
+                })
+    return candidates
+
+
+class SuccessiveHalving:
+    # search of the best variant among many candidates: all of them are simulated on
+    # min_repetitions seeds, then only the best 1/eta of them on eta times more seeds,
+    # and so on until a single candidate is left or all the seeds are used, the
+    # candidates left are then simulated on all the seeds
+    #
+    # the candidates are ranked by their mean energy difference % w.r.t. the baseline
+    # on the same seeds, after the ones losing more than max_task_cycles_loss % of the
+    # task cycles of the baseline
+    def __init__(self, topology: dict[str, int], candidates: list[dict[str, Any]], load: tuple[int, int, float],
+                 seeds: list[int], duration_ms: int, min_repetitions: int = 4, eta: int = 3,
+                 baseline: dict[str, Any] | None = None, max_task_cycles_loss: float = 1.0) -> None:
+        assert(eta >= 2 and min_repetitions >= 1)
+        self._topology: dict[str, int] = topology
+        self._candidates: list[dict[str, Any]] = candidates
+        self._load: tuple[int, int, float] = load
+        self._seeds: list[int] = seeds
+        self._duration_ms: int = duration_ms
+        self._min_repetitions: int = min(min_repetitions, len(seeds))
+        self._eta: int = eta
+        self._baseline: dict[str, Any] = baseline if baseline is not None else {"class": "EAS"}
+        self._max_task_cycles_loss: float = max_task_cycles_loss
+
+        self._results: dict[str, dict[str, Any]] = {}
+        # (rung, candidate, repetitions, energy diff % mean, task cycles diff % mean, kept)
+        self._rungs: list[tuple[int, dict[str, Any], int, float, float, bool]] = []
+
+    @property
+    def rungs(self) -> list[tuple[int, dict[str, Any], int, float, float, bool]]:
+        return self._rungs
+
+    @property
+    def nbr_runs(self) -> int:
+        return len(self._results)
+
+    def _job(self, variant: dict[str, Any], seed: int) -> Job:
+        return Job(self._topology, variant, self._load, seed, self._duration_ms)
+
+    def _simulate(self, pool: Any, variants: list[dict[str, Any]], repetitions: int, store: ColumnStore | None) -> None:
+        # the runs already done at a previous rung are reused
+        pending: list[Job] = [job for job in (self._job(variant, seed) for variant in variants for seed in self._seeds[:repetitions])
+                              if job.key not in self._results]
+        for job, metrics in pool.imap_unordered(_run, pending):
+            self._results[job.key] = metrics
+            if store is not None:
+                store.append(job_run(job), metrics)
+
+    def differences(self, variant: dict[str, Any], repetitions: int) -> tuple[list[float], list[float], list[float], list[float], list[float]]:
+        hist: tuple[list[float], list[float], list[float], list[float], list[float]] = ([], [], [], [], [])
+        for seed in self._seeds[:repetitions]:
+            append_difference(hist, self._results[self._job(variant, seed).key], self._results[self._job(self._baseline, seed).key])
+        return hist
+
+    def placements(self, variant: dict[str, Any], repetitions: int) -> tuple[list[int], list[int]]:
+        metrics: list[dict[str, Any]] = [self._results[self._job(variant, seed).key] for seed in self._seeds[:repetitions]]
+        return [run["task_placed_energy_aware"] for run in metrics], [run["task_placed_by_load_balancing"] for run in metrics]
+
+    def _rank(self, candidates: list[dict[str, Any]], repetitions: int) -> list[tuple[dict[str, Any], float, float]]:
+        scores: list[tuple[dict[str, Any], float, float]] = []
+        for candidate in candidates:
+            hist = self.differences(candidate, repetitions)
+            scores.append((candidate, float(np.mean(hist[0])), float(np.mean(hist[1]))))
+        # sorted() is stable, the ties keep the order of the candidates
+        return sorted(scores, key=lambda score: (score[2] < -self._max_task_cycles_loss, score[1]))
+
+    def run(self, jobs: int = multiprocessing.cpu_count(), store: ColumnStore | None = None) -> list[dict[str, Any]]:
+        # returns the candidates of the last rung, best first
+        survivors: list[dict[str, Any]] = list(self._candidates)
+        repetitions: int = self._min_repetitions
+        rung: int = 0
+        if store is not None:
+            store.register("variant", [variant_name(self._baseline)] + [variant_name(candidate) for candidate in survivors])
+        with multiprocessing.Pool(jobs) as pool:
+            while True:
+                last: bool = len(survivors) == 1 or repetitions == len(self._seeds)
+                if len(survivors) == 1:
+                    repetitions = len(self._seeds)
+                self._simulate(pool, [self._baseline] + survivors, repetitions, store)
+
+                ranked: list[tuple[dict[str, Any], float, float]] = self._rank(survivors, repetitions)
+                nbr_kept: int = len(ranked) if last else max(1, math.ceil(len(ranked) / self._eta))
+                for i, (candidate, energy_diff, task_cycles_diff) in enumerate(ranked):
+                    self._rungs.append((rung, candidate, repetitions, energy_diff, task_cycles_diff, i < nbr_kept))
+                survivors = [candidate for candidate, _, _ in ranked[:nbr_kept]]
+                if last:
+                    return survivors
+
+                rung += 1
+                repetitions = min(repetitions * self._eta, len(self._seeds))
+
+
+def write_rungs(rungs: list[tuple[int, dict[str, Any], int, float, float, bool]], file_name: str) -> None:
+    with open(file_name, "w") as f:
+        f.write("Rung,Version,Count limit,Lower limit %,Upper limit %,Repetitions,Energy diff % mean,Task cycles diff % mean,Kept\n")
+        for rung, candidate, repetitions, energy_diff, task_cycles_diff, kept in rungs:
+            f.write("{},{},{},{},{},{},{},{},{}\n".format(
+                rung, variant_name(candidate), candidate.get("count_limit", ""), candidate.get("lower_limit", ""),
+                candidate.get("upper_limit", candidate.get("load_limit", "")), repetitions, np.round(energy_diff, 1), np.round(task_cycles_diff, 1), kept))
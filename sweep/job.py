@@ -0,0 +1,47 @@
+from __future__ import annotations
+from typing import Any, TYPE_CHECKING
+if TYPE_CHECKING:
+    from sweep import Job
+    from profiler import Profiler
+
+import scheduler
+from scheduler import LoadGenerator, ArrivalProcess
+from energy_model import EnergyModel
+from cpu import CPU, CPUGenerator
+
+# topologies already built by this process
+_topologies: dict[str, tuple[list[CPU], EnergyModel]] = {}
+
+
+def run_job(job: Job) -> dict[str, Any]:
+    if job.topology_name not in _topologies:
+        cpus: list[CPU] = CPUGenerator.gen(**job.topology)
+        _topologies[job.topology_name] = (cpus, EnergyModel(cpus))
+    cpus, em = _topologies[job.topology_name]
+
+    kwargs: dict[str, Any] = {k: v for k, v in job.variant.items() if k not in ("class", "name")}
+    load_gen = LoadGenerator(*job.load, job.seed, arrival_process(job.arrival))
+    sched = getattr(scheduler, job.variant["class"])(load_gen, cpus, em, **kwargs)
+    sched.run(job.duration_ms, job.coarse_tick_ms)
+
+    return profiler_metrics(sched.profiler)
+
+
+def arrival_process(spec: dict[str, Any] | None) -> ArrivalProcess | None:
+    # arrival process of a grid spec, see sweep/grid.py
+    if spec is None:
+        return None
+    return getattr(scheduler, spec["process"])(**{k: v for k, v in spec.items() if k != "process"})
+
+
+def profiler_metrics(profiler: Profiler) -> dict[str, Any]:
+    return {
+        "total_energy": profiler.total_energy,
+        "cycles_hist": list(profiler.cycles_hist),
+        "created_task": profiler.created_task,
+        "ended_task": profiler.ended_task,
+        "task_placed_energy_aware": profiler.task_placed_energy_aware,
+        "task_placed_by_load_balancing": profiler.task_placed_by_load_balancing,
+        "waiting_time_hist": profiler.waiting_time_hist.to_sparse(),
+        "response_time_hist": profiler.response_time_hist.to_sparse(),
+    }
@@ -0,0 +1,49 @@
+from __future__ import annotations
+from typing import Any, TYPE_CHECKING
+if TYPE_CHECKING:
+    from sweep import Job
+
+import json
+import os
+
+
+class Ledger:
+    # append-only JSON lines file, one line per completed job
+    def __init__(self, file_name: str) -> None:
+        self._file_name: str = file_name
+        self._completed: dict[str, dict[str, Any]] = {}
+
+        if os.path.exists(file_name):
+            with open(file_name) as f:
+                for line in f:
+                    try:
+                        record: dict[str, Any] = json.loads(line)
+                    except json.JSONDecodeError:
+                        # last line partially written by a killed sweep
+                        continue
+                    self._completed[record["key"]] = record
+
+        self._file = open(file_name, "a")
+        if self._file.tell() > 0:
+            with open(file_name, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # terminate the line left partial by a killed sweep
+                    self._file.write("\n")
+
+    @property
+    def completed(self) -> dict[str, dict[str, Any]]:
+        return self._completed
+
+    def __contains__(self, job: Job) -> bool:
+        return job.key in self._completed
+
+    def append(self, job: Job, metrics: dict[str, Any]) -> None:
+        record: dict[str, Any] = {"key": job.key, "job": job.to_dict(), "metrics": metrics}
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._completed[job.key] = record
+
+    def close(self) -> None:
+        self._file.close()
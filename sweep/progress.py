@@ -0,0 +1,120 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any
+if TYPE_CHECKING:
+    from multiprocessing.process import BaseProcess
+    from scheduler import EAS
+
+import multiprocessing
+import multiprocessing.connection
+import threading
+import time
+
+
+class ProgressSlot:
+    # progress of one experiment, written by the process running it,
+    # the simulated time of the running scheduler is published by a thread
+    # every interval so that the simulation loop itself is left untouched
+    def __init__(self, values: Any, index: int, interval_s: float) -> None:
+        self._values = values
+        self._index: int = index
+        self._interval_s: float = interval_s
+        self._completed_ms: int = 0
+        self._scheduler: EAS | None = None
+        # created in the process running the experiment
+        self._lock: threading.Lock | None = None
+
+    def _publish(self) -> None:
+        assert(self._lock is not None)
+        with self._lock:
+            running_ms: int = self._scheduler.time if self._scheduler is not None else 0
+            self._values[2 * self._index] = self._completed_ms + running_ms
+
+    def _publish_periodically(self) -> None:
+        while True:
+            time.sleep(self._interval_s)
+            self._publish()
+
+    def track(self, scheduler: EAS) -> None:
+        # scheduler is about to run from time 0
+        if self._lock is None:
+            self._lock = threading.Lock()
+            threading.Thread(target=self._publish_periodically, daemon=True).start()
+        with self._lock:
+            self._scheduler = scheduler
+
+    def run_done(self) -> None:
+        # the tracked scheduler has completed its run
+        assert(self._lock is not None and self._scheduler is not None)
+        with self._lock:
+            self._completed_ms += self._scheduler.time
+            self._scheduler = None
+        self._publish()
+
+    def repetition_done(self) -> None:
+        self._values[2 * self._index + 1] += 1
+
+
+class Progress:
+    # progress of experiments running in other processes, each experiment has a
+    # slot of shared memory holding the simulated time and the repetitions done
+    def __init__(self, interval_s: float = 10) -> None:
+        self._interval_s: float = interval_s
+        self._names: list[str] = []
+        self._totals_ms: list[int] = []
+        self._repetitions: list[int] = []
+        self._values = None
+
+    def add(self, name: str, total_ms: int, repetitions: int) -> int:
+        # total_ms of simulated time over all the runs of the experiment
+        assert(self._values is None)
+        self._names.append(name)
+        self._totals_ms.append(total_ms)
+        self._repetitions.append(repetitions)
+        return len(self._names) - 1
+
+    def slot(self, index: int) -> ProgressSlot:
+        # to send to the process running the experiment, all the experiments must be added before
+        if self._values is None:
+            self._values = multiprocessing.RawArray("d", 2 * len(self._names))
+        return ProgressSlot(self._values, index, self._interval_s)
+
+    def watch(self, processes: list[BaseProcess], log_file: str | None = None) -> None:
+        # render the progress until the processes exit, the throughput
+        # of each interval is appended to log_file as CSV
+        assert(self._values is not None)
+        start: float = time.time()
+        last_time: float = start
+        last_done: list[float] = [0] * len(self._names)
+        log = open(log_file, "w") if log_file is not None else None
+        if log is not None:
+            log.write("Wall time s,Experiment,Simulated ms,Repetitions,Simulated ms per s\n")
+
+        sentinels: list[int] = [proc.sentinel for proc in processes]
+        try:
+            while sentinels:
+                for sentinel in multiprocessing.connection.wait(sentinels, self._interval_s):
+                    sentinels.remove(sentinel)  # type: ignore
+                now: float = time.time()
+
+                for i, name in enumerate(self._names):
+                    done: float = self._values[2 * i]
+                    repetitions: int = int(self._values[2 * i + 1])
+                    rate: float = (done - last_done[i]) / (now - last_time)
+                    if log is not None:
+                        log.write(f"{round(now - start, 1)},{name},{int(done)},{repetitions},{round(rate)}\n")
+                    # the completed experiments are only rendered once
+                    reported: bool = done == last_done[i] and done >= self._totals_ms[i]
+                    last_done[i] = done
+                    if reported:
+                        continue
+
+                    mean_rate: float = done / (now - start)
+                    eta: str = f"{(self._totals_ms[i] - done) / mean_rate / 60:.1f} min" if mean_rate > 0 else "?"
+                    print(f"{name}: {done / self._totals_ms[i] * 100:.1f}%, {repetitions}/{self._repetitions[i]} repetitions,"
+                          f" {round(rate)} simulated ms/s, ETA {eta}")
+                last_time = now
+                if log is not None:
+                    log.flush()
+        finally:
+            if log is not None:
+                log.close()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+from typing import Any
+
+import hashlib
+import json
+import os
+import random
+import socket
+import threading
+
+from sweep.grid import Grid, Job
+
+
+class WorkQueue:
+    # lock-free queue of sweep jobs on a shared directory, a job is a file that
+    # moves pending/ -> claimed/ -> done/ with atomic renames:
+    #   grid.json                    the grid spec the queue was created from
+    #   pending/<id>.json            job waiting for a worker
+    #   claimed/<id>@<worker>.json   job being simulated by a worker
+    #   done/<id>.json               job completed, its metrics are in results/
+    #   results/<id>.json            metrics of the job
+    #   heartbeats/<worker>          touched periodically by each live worker
+    def __init__(self, directory: str) -> None:
+        self._dir: str = directory
+        for sub_dir in ("pending", "claimed", "done", "results", "heartbeats"):
+            os.makedirs(os.path.join(directory, sub_dir), exist_ok=True)
+
+    @staticmethod
+    def job_id(job: Job) -> str:
+        return hashlib.sha1(job.key.encode()).hexdigest()
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self._dir, *parts)
+
+    def _write_atomic(self, path: str, content: str) -> None:
+        tmp_path: str = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.rename(tmp_path, path)
+
+    def init(self, grid_spec: dict[str, Any]) -> int:
+        # enqueue the jobs of the grid that are neither pending, claimed nor done
+        self._write_atomic(self._path("grid.json"), json.dumps(grid_spec))
+        known: set[str] = {name.split("@")[0].removesuffix(".json")
+                           for sub_dir in ("pending", "claimed", "done") for name in os.listdir(self._path(sub_dir))}
+        enqueued: int = 0
+        for job in Grid(grid_spec).jobs():
+            job_id: str = self.job_id(job)
+            if job_id not in known:
+                self._write_atomic(self._path("pending", f"{job_id}.json"), json.dumps(job.to_dict()))
+                enqueued += 1
+        return enqueued
+
+    @property
+    def grid(self) -> Grid:
+        with open(self._path("grid.json")) as f:
+            return Grid(json.load(f))
+
+    def claim(self, worker: str) -> tuple[str, Job] | None:
+        pending: list[str] = [name for name in os.listdir(self._path("pending")) if name.endswith(".json")]
+        # random order so that concurrent workers rarely race for the same job
+        random.shuffle(pending)
+        for name in pending:
+            job_id: str = name.removesuffix(".json")
+            claimed_path: str = self._path("claimed", f"{job_id}@{worker}.json")
+            try:
+                os.rename(self._path("pending", name), claimed_path)
+            except FileNotFoundError:
+                # claimed by another worker in the meantime
+                continue
+            with open(claimed_path) as f:
+                return job_id, Job.from_dict(json.load(f))
+        return None
+
+    def complete(self, worker: str, job_id: str, job: Job, metrics: dict[str, Any]) -> None:
+        self._write_atomic(self._path("results", f"{job_id}.json"), json.dumps({"key": job.key, "metrics": metrics}))
+        try:
+            os.rename(self._path("claimed", f"{job_id}@{worker}.json"), self._path("done", f"{job_id}.json"))
+        except FileNotFoundError:
+            # the job was requeued because this worker looked dead,
+            # the result is deterministic so the other run will write the same
+            pass
+
+    def heartbeat(self, worker: str) -> None:
+        path: str = self._path("heartbeats", worker)
+        with open(path, "a"):
+            pass
+        os.utime(path)
+
+    def recover(self, worker: str, timeout_s: float) -> int:
+        # requeue the jobs claimed by workers whose heartbeat is older than timeout_s,
+        # our own fresh heartbeat gives the current time of the shared file system
+        # so that the clocks of the hosts do not need to agree
+        self.heartbeat(worker)
+        now: float = os.stat(self._path("heartbeats", worker)).st_mtime
+        requeued: int = 0
+        for name in os.listdir(self._path("claimed")):
+            job_id, owner = name.removesuffix(".json").split("@", 1)
+            try:
+                last_beat: float = os.stat(self._path("heartbeats", owner)).st_mtime
+            except FileNotFoundError:
+                last_beat = -float("inf")
+            if now - last_beat > timeout_s:
+                try:
+                    os.rename(self._path("claimed", name), self._path("pending", f"{job_id}.json"))
+                    requeued += 1
+                except FileNotFoundError:
+                    pass
+        return requeued
+
+    def count(self, sub_dir: str) -> int:
+        return sum(1 for name in os.listdir(self._path(sub_dir)) if name.endswith(".json"))
+
+    def results(self) -> dict[str, dict[str, Any]]:
+        # metrics of the completed jobs by job key
+        results: dict[str, dict[str, Any]] = {}
+        for name in os.listdir(self._path("done")):
+            with open(self._path("results", name)) as f:
+                record: dict[str, Any] = json.load(f)
+            results[record["key"]] = record["metrics"]
+        return results
+
+
+def work(directory: str, worker: str | None = None, heartbeat_s: float = 10, timeout_s: float = 60, poll_s: float = 5) -> int:
+    # claim and simulate jobs until none is pending nor claimed by a live worker
+    from sweep.job import run_job
+
+    if worker is None:
+        worker = f"{socket.gethostname()}-{os.getpid()}"
+    queue = WorkQueue(directory)
+
+    stop = threading.Event()
+
+    def beat() -> None:
+        while not stop.wait(heartbeat_s):
+            queue.heartbeat(worker)
+
+    queue.heartbeat(worker)
+    beating = threading.Thread(target=beat, daemon=True)
+    beating.start()
+
+    completed: int = 0
+    try:
+        while True:
+            claimed: tuple[str, Job] | None = queue.claim(worker)
+            if claimed is None:
+                queue.recover(worker, timeout_s)
+                if queue.count("pending") == 0 and queue.count("claimed") == 0:
+                    break
+                stop.wait(poll_s)
+                continue
+
+            job_id, job = claimed
+            queue.complete(worker, job_id, job, run_job(job))
+            completed += 1
+    finally:
+        stop.set()
+        beating.join()
+        os.remove(os.path.join(directory, "heartbeats", worker))
+
+    return completed
@@ -0,0 +1,200 @@
+from __future__ import annotations
+from typing import Any, TYPE_CHECKING
+if TYPE_CHECKING:
+    from sweep import Grid
+    from sweep.store import ColumnTable
+
+import os
+import numpy as np
+
+from profiler import LogHistogram
+from sweep.grid import Job, variant_name
+from sweep.store import CYCLES_COLUMNS
+
+
+def write_differences(diff_hist: dict[str, tuple[list[float], list[float], list[float], list[float], list[float]]], file_name: str):
+    # output means of the difference history
+    with open(file_name, "w") as f:
+        f.write("Version,Energy diff % mean,Task cycles diff % mean,Energy cycles diff % mean,Balance cycles diff % mean,Idle cycles diff % mean\n")
+        for version_name in diff_hist.keys():
+            hist = diff_hist[version_name]
+            f.write("{},{},{},{},{},{}\n".format(
+                version_name,
+                np.round(np.mean(hist[0]), 1),
+                np.round(np.mean(hist[1]), 1),
+                np.round(np.mean(hist[2]), 1),
+                np.round(np.mean(hist[3]), 1),
+                np.round(np.mean(hist[4]), 1),
+            ))
+
+
+def write_placement(placement_hist: dict[str, tuple[list[int], list[int]]], file_name: str):
+    # output means of the task placement history
+    with open(file_name, "w") as f:
+        f.write("Version,Proportion % of task placed by energy aware mean\n")
+        for version_name in placement_hist.keys():
+            hist = placement_hist[version_name]
+            energy_hist = np.array(hist[0])
+            balance_hist = np.array(hist[1])
+            total = energy_hist + balance_hist
+            energy_propotion = energy_hist / total * 100
+            f.write("{},{}\n".format(
+                version_name,
+                np.round(energy_propotion.mean(), 1),
+            ))
+
+
+def write_latency(latency_hist: dict[str, tuple[LogHistogram, LogHistogram]], file_name: str):
+    # output percentiles of the waiting and response times over all repetitions
+    with open(file_name, "w") as f:
+        f.write("Version,Waiting time p50 ms,Waiting time p95 ms,Waiting time p99 ms,Response time p50 ms,Response time p95 ms,Response time p99 ms\n")
+        for version_name in latency_hist.keys():
+            waiting_hist, response_hist = latency_hist[version_name]
+            f.write("{},{},{},{},{},{},{}\n".format(
+                version_name,
+                waiting_hist.percentile(50),
+                waiting_hist.percentile(95),
+                waiting_hist.percentile(99),
+                response_hist.percentile(50),
+                response_hist.percentile(95),
+                response_hist.percentile(99),
+            ))
+
+
+def write_variance(runs: dict[str, tuple[list[float], list[float], list[float], list[float], list[float]]], baseline: str,
+                   file_name: str, antithetic: bool = False):
+    # runs holds the energy and the task, energy, balance and idle cycles of each repetition,
+    # the standard error of the mean difference % of each version w.r.t. the baseline run on
+    # the same workload is compared to the one of independent workloads for as many runs,
+    # estimated from the variance of each version alone (delta method), their squared ratio
+    # is the factor by which the repetitions can be divided for the same confidence,
+    # with antithetic the repetitions 2k and 2k+1 are averaged first
+    baseline_runs = runs[baseline]
+    with open(file_name, "w") as f:
+        f.write("Version,Metric,Diff % mean,Std error,Independent std error,Variance reduction factor\n")
+        for version_name, version_runs in runs.items():
+            if version_name == baseline:
+                continue
+            for metric, values, baseline_values in zip(("Energy", "Task cycles", "Energy cycles", "Balance cycles", "Idle cycles"),
+                                                       version_runs, baseline_runs):
+                x = np.asarray(values, dtype=np.float64)
+                b = np.asarray(baseline_values, dtype=np.float64)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    diff = (x / b - 1) * 100
+                    if antithetic:
+                        nbr_pairs: int = len(diff) // 2
+                        units = (diff[0:2 * nbr_pairs:2] + diff[1:2 * nbr_pairs:2]) / 2
+                    else:
+                        units = diff
+                    std_error = units.std(ddof=1) / np.sqrt(len(units)) if len(units) > 1 else np.nan
+                    ratio = x.mean() / b.mean()
+                    independent_std_error = 100 * abs(ratio) * np.sqrt(
+                        (x.var(ddof=1) / x.mean()**2 + b.var(ddof=1) / b.mean()**2) / len(x)) if len(x) > 1 else np.nan
+                    reduction = (independent_std_error / std_error)**2
+                f.write("{},{},{},{},{},{}\n".format(
+                    version_name, metric,
+                    np.round(diff.mean(), 1),
+                    np.round(std_error, 3),
+                    np.round(independent_std_error, 3),
+                    np.round(reduction, 1),
+                ))
+
+
+def append_difference(hist: tuple[list[float], list[float], list[float], list[float], list[float]],
+                      metrics: dict[str, Any], baseline: dict[str, Any]) -> None:
+    hist[0].append((metrics["total_energy"] / baseline["total_energy"] - 1) * 100)
+    for i in range(4):
+        hist[i + 1].append((metrics["cycles_hist"][i] / baseline["cycles_hist"][i] - 1) * 100)
+
+
+def write_grid_reports(grid: Grid, results: dict[str, dict[str, Any]], output_dir: str = ".") -> None:
+    # results maps job keys to profiler metrics,
+    # repetitions whose baseline run is missing are ignored
+    baseline_variant: dict[str, Any] = grid.variants[0]
+    for topology in grid.topologies:
+        for load in grid.loads:
+            diff_hist: dict[str, tuple[list[float], list[float], list[float], list[float], list[float]]] = \
+                {variant_name(variant): ([], [], [], [], []) for variant in grid.variants[1:]}
+            placement_hist: dict[str, tuple[list[int], list[int]]] = \
+                {variant_name(variant): ([], []) for variant in grid.variants}
+            latency_hist: dict[str, tuple[LogHistogram, LogHistogram]] = \
+                {variant_name(variant): (LogHistogram(), LogHistogram()) for variant in grid.variants}
+
+            for seed in grid.seeds:
+                baseline_job = Job(topology, baseline_variant, load, seed, grid.duration_ms, grid.coarse_tick_ms, grid.arrival)
+                if baseline_job.key not in results:
+                    continue
+                baseline: dict[str, Any] = results[baseline_job.key]
+
+                for variant in grid.variants:
+                    job = Job(topology, variant, load, seed, grid.duration_ms, grid.coarse_tick_ms, grid.arrival)
+                    if job.key not in results:
+                        continue
+                    metrics: dict[str, Any] = results[job.key]
+
+                    if job.variant_name in diff_hist:
+                        append_difference(diff_hist[job.variant_name], metrics, baseline)
+
+                    hist = placement_hist[job.variant_name]
+                    hist[0].append(metrics["task_placed_energy_aware"])
+                    hist[1].append(metrics["task_placed_by_load_balancing"])
+
+                    waiting_hist, response_hist = latency_hist[job.variant_name]
+                    waiting_hist.merge(LogHistogram.from_sparse(metrics.get("waiting_time_hist", [])))
+                    response_hist.merge(LogHistogram.from_sparse(metrics.get("response_time_hist", [])))
+
+            suffix: str = grid.output_suffix(topology, load)
+            write_placement(placement_hist, os.path.join(output_dir, f"placement_{suffix}.csv"))
+            write_differences(diff_hist, os.path.join(output_dir, f"diff_{suffix}.csv"))
+            write_latency(latency_hist, os.path.join(output_dir, f"latency_{suffix}.csv"))
+
+
+def write_store_reports(table: ColumnTable, output_dir: str = ".", baseline: str = "EAS", prefix: str = "",
+                        baseline_placement: bool = True) -> None:
+    # same diff_/placement_ files as write_grid_reports() computed from the runs of a
+    # column store, the runs of a variant are paired with the baseline run of same
+    # parameters, seed and repetition, runs without baseline are ignored in the differences,
+    # the calibration files of run-scheduling-exp.py have no placement of the baseline
+    load_columns: tuple[str, ...] = ("pick_distrib_insts", "max_distrib_insts", "create_task_prob",
+                                     "duration_ms", "coarse_tick_ms", "arrival")
+    _, run_of = table.unique_rows(("topology",) + load_columns + ("seed", "repetition"))
+    is_baseline: np.ndarray = table["variant"] == table.code("variant", baseline)
+    baseline_row: np.ndarray = np.full(run_of.max(initial=-1) + 1, -1)
+    baseline_row[run_of[is_baseline]] = np.nonzero(is_baseline)[0]
+    paired: np.ndarray = baseline_row[run_of]
+
+    differences: list[np.ndarray] = []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for column in ("total_energy",) + CYCLES_COLUMNS[:4]:
+            values: np.ndarray = np.asarray(table[column], dtype=np.float64)
+            differences.append((values / values[paired] - 1) * 100)
+
+    # group the rows by topology and load, then by variant, the variant codes follow
+    # the order of their first run, within a variant the runs are ordered by seed and repetition
+    loads, _ = table.unique_rows(load_columns)
+    groups, group_of = table.unique_rows(("topology",) + load_columns)
+    order: np.ndarray = np.lexsort((table["repetition"], table["seed"], table["variant"], group_of))
+    sorted_groups: np.ndarray = group_of[order]
+    for group in range(len(groups)):
+        rows: np.ndarray = order[np.searchsorted(sorted_groups, group):np.searchsorted(sorted_groups, group, side="right")]
+        row_variants: np.ndarray = table["variant"][rows]
+        diff_hist: dict[str, tuple[np.ndarray, ...]] = {}
+        placement_hist: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for variant in np.unique(row_variants):
+            variant_rows: np.ndarray = rows[row_variants == variant]
+            name: str = table.categories["variant"][variant]
+            if name == baseline and not baseline_placement:
+                continue
+            placement_hist[name] = (table["task_placed_energy_aware"][variant_rows],
+                                    table["task_placed_by_load_balancing"][variant_rows])
+            if name != baseline:
+                variant_rows = variant_rows[paired[variant_rows] >= 0]
+                diff_hist[name] = tuple(difference[variant_rows] for difference in differences)
+
+        topology: str = table.categories["topology"][groups[group]["topology"]]
+        suffix: str = topology
+        # same file names as write_grid_reports() when there is a single load
+        if len(loads) > 1:
+            suffix = "{}_{}_{}_{}".format(topology, *(groups[group][column].item() for column in load_columns[:3]))
+        write_placement(placement_hist, os.path.join(output_dir, f"placement_{prefix}{suffix}.csv"))  # type: ignore
+        write_differences(diff_hist, os.path.join(output_dir, f"diff_{prefix}{suffix}.csv"))  # type: ignore
@@ -0,0 +1,210 @@
+from __future__ import annotations
+from typing import Any, TYPE_CHECKING
+if TYPE_CHECKING:
+    from sweep import Job
+
+import json
+import os
+import numpy as np
+
+# raw little endian column files <column>.bin, appended row by row and memory
+# mapped on load, the categorical columns hold indexes in categories.json
+COLUMNS: dict[str, str] = {
+    # run parameters
+    "topology": "<i4",
+    "variant": "<i4",
+    "arrival": "<i4",
+    "little": "<i4",
+    "middle": "<i4",
+    "big": "<i4",
+    "pick_distrib_insts": "<i8",
+    "max_distrib_insts": "<i8",
+    "create_task_prob": "<f8",
+    "seed": "<i8",
+    "repetition": "<i8",
+    "duration_ms": "<i8",
+    "coarse_tick_ms": "<i8",
+    # profiler metrics
+    "total_energy": "<i8",
+    "cycles_task": "<i8",
+    "cycles_energy": "<i8",
+    "cycles_balance": "<i8",
+    "cycles_idle": "<i8",
+    "cycles_slack": "<i8",
+    "created_task": "<i8",
+    "ended_task": "<i8",
+    "task_placed_energy_aware": "<i8",
+    "task_placed_by_load_balancing": "<i8",
+}
+CATEGORICAL_COLUMNS: tuple[str, ...] = ("topology", "variant", "arrival")
+CYCLES_COLUMNS: tuple[str, ...] = ("cycles_task", "cycles_energy", "cycles_balance", "cycles_idle", "cycles_slack")
+# default of the parameter columns missing from a run
+_DEFAULTS: dict[str, Any] = {"arrival": "bernoulli", "little": 0, "middle": 0, "big": 0,
+                             "seed": -1, "repetition": 0, "coarse_tick_ms": 0}
+
+
+class ColumnStore:
+    # append-only columnar store of the runs, one writer per directory,
+    # the rows are buffered and only written by flush(), with sync the
+    # column files are also synced to the disk at each flush
+    def __init__(self, directory: str, flush_every: int = 1000, truncate: bool = False, sync: bool = False) -> None:
+        self._dir: str = directory
+        self._flush_every: int = flush_every
+        self._sync: bool = sync
+        os.makedirs(directory, exist_ok=True)
+        if truncate:
+            for column in COLUMNS:
+                open(self._path(f"{column}.bin"), "wb").close()
+
+        self._categories: dict[str, list[str]] = {column: [] for column in CATEGORICAL_COLUMNS}
+        if not truncate and os.path.exists(self._path("categories.json")):
+            with open(self._path("categories.json")) as f:
+                self._categories.update(json.load(f))
+        self._codes: dict[str, dict[str, int]] = {
+            column: {value: code for code, value in enumerate(values)} for column, values in self._categories.items()}
+
+        self._buffer: dict[str, list[Any]] = {column: [] for column in COLUMNS}
+        self._write_categories()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self._dir, name)
+
+    def _code(self, column: str, value: str) -> int:
+        codes: dict[str, int] = self._codes[column]
+        if value not in codes:
+            codes[value] = len(codes)
+            self._categories[column].append(value)
+        return codes[value]
+
+    def register(self, column: str, values: list[str]) -> None:
+        # reserve the codes of categorical values, the reports list them in code order
+        for value in values:
+            self._code(column, value)
+
+    def append(self, run: dict[str, Any], metrics: dict[str, Any]) -> None:
+        # run holds the parameter columns, the categorical ones as strings,
+        # metrics is returned by profiler_metrics()
+        row: dict[str, Any] = _DEFAULTS | run
+        for column in CATEGORICAL_COLUMNS:
+            row[column] = self._code(column, row[column])
+        for column, cycles in zip(CYCLES_COLUMNS, metrics["cycles_hist"]):
+            row[column] = cycles
+        for column in ("total_energy", "created_task", "ended_task", "task_placed_energy_aware", "task_placed_by_load_balancing"):
+            row[column] = metrics[column]
+
+        for column in COLUMNS:
+            self._buffer[column].append(row[column])
+        if len(self._buffer["topology"]) >= self._flush_every:
+            self.flush()
+
+    def _write_categories(self) -> None:
+        tmp_path: str = self._path(f"categories.json.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._categories, f)
+        os.replace(tmp_path, self._path("categories.json"))
+
+    def flush(self) -> None:
+        if not self._buffer["topology"]:
+            return
+        # categories first, so that every code on disk has its value
+        self._write_categories()
+        for column, dtype in COLUMNS.items():
+            with open(self._path(f"{column}.bin"), "ab") as f:
+                f.write(np.asarray(self._buffer[column], dtype=dtype).tobytes())
+                if self._sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._buffer[column] = []
+
+    def close(self) -> None:
+        self.flush()
+
+
+def job_run(job: Job) -> dict[str, Any]:
+    # parameter columns of a sweep job
+    return {
+        "topology": job.topology_name,
+        "variant": job.variant_name,
+        "arrival": "bernoulli" if job.arrival is None else json.dumps(job.arrival, sort_keys=True),
+        "little": job.topology.get("little", 0),
+        "middle": job.topology.get("middle", 0),
+        "big": job.topology.get("big", 0),
+        "pick_distrib_insts": job.load[0],
+        "max_distrib_insts": job.load[1],
+        "create_task_prob": job.load[2],
+        "seed": job.seed,
+        "repetition": job.seed,
+        "duration_ms": job.duration_ms,
+        "coarse_tick_ms": job.coarse_tick_ms or 0,
+    }
+
+
+class ColumnTable:
+    # columns of one or several stores
+    def __init__(self, columns: dict[str, np.ndarray], categories: dict[str, list[str]]) -> None:
+        self.columns: dict[str, np.ndarray] = columns
+        self.categories: dict[str, list[str]] = categories
+
+    def __len__(self) -> int:
+        return len(self.columns["topology"])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def code(self, column: str, value: str) -> int:
+        # -1 if no run has this value
+        values: list[str] = self.categories[column]
+        return values.index(value) if value in values else -1
+
+    def unique_rows(self, columns: tuple[str, ...]) -> tuple[np.ndarray, np.ndarray]:
+        # distinct combinations of the columns in lexicographic order and the combination
+        # of each row, factorized one column at a time as sorting records is far slower
+        combination_of: np.ndarray = np.zeros(len(self), dtype=np.int64)
+        for column in columns:
+            values, value_of = np.unique(self.columns[column], return_inverse=True)
+            combination_of = np.unique(combination_of * len(values) + value_of, return_inverse=True)[1]
+        _, first_rows, combination_of = np.unique(combination_of, return_index=True, return_inverse=True)
+
+        combinations = np.empty(len(first_rows), dtype=[(column, self.columns[column].dtype) for column in columns])
+        for column in columns:
+            combinations[column] = self.columns[column][first_rows]
+        return combinations, combination_of
+
+
+def load_store(directory: str) -> ColumnTable:
+    # memory maps the columns, the rows partially written by a crash are ignored
+    with open(os.path.join(directory, "categories.json")) as f:
+        categories: dict[str, list[str]] = json.load(f)
+
+    paths: dict[str, str] = {column: os.path.join(directory, f"{column}.bin") for column in COLUMNS}
+    nbr_rows: int = min(os.path.getsize(paths[column]) // np.dtype(dtype).itemsize if os.path.exists(paths[column]) else 0
+                        for column, dtype in COLUMNS.items())
+    columns: dict[str, np.ndarray] = {}
+    for column, dtype in COLUMNS.items():
+        if nbr_rows == 0:
+            # an empty file cannot be memory mapped
+            columns[column] = np.zeros(0, dtype)
+        else:
+            columns[column] = np.memmap(paths[column], dtype=dtype, mode="r", shape=(nbr_rows,))
+    return ColumnTable(columns, categories)
+
+
+def load_stores(directories: list[str]) -> ColumnTable:
+    # concatenation of several stores, their categorical codes are remapped
+    tables: list[ColumnTable] = [load_store(directory) for directory in directories]
+    if len(tables) == 1:
+        return tables[0]
+
+    categories: dict[str, list[str]] = {column: [] for column in CATEGORICAL_COLUMNS}
+    columns: dict[str, list[np.ndarray]] = {column: [] for column in COLUMNS}
+    for table in tables:
+        for column in COLUMNS:
+            values: np.ndarray = table[column]
+            if column in CATEGORICAL_COLUMNS and len(values) > 0:
+                for value in table.categories[column]:
+                    if value not in categories[column]:
+                        categories[column].append(value)
+                remap = np.asarray([categories[column].index(value) for value in table.categories[column]], dtype=COLUMNS[column])
+                values = remap[values]
+            columns[column].append(values)
+    return ColumnTable({column: np.concatenate(values) for column, values in columns.items()}, categories)